@@ -23,6 +23,24 @@ interface DashboardData {
   predictions_today: number
 }
 
+// Helper function to read the latest-state snapshot published by the Python pipeline.
+// It holds status, last sample and last forecast set in one small, atomically replaced file.
+function getLatestState(): any {
+  const latestStatePath = path.join(process.cwd(), "data", "latest_state.json")
+
+  try {
+    if (!fs.existsSync(latestStatePath)) {
+      return null
+    }
+
+    const data = fs.readFileSync(latestStatePath, "utf-8")
+    return JSON.parse(data)
+  } catch (error) {
+    console.error("Error reading latest state file:", error)
+    return null
+  }
+}
+
 // Helper function to read status file
 function getSystemStatus(): any {
   const statusPath = path.join(process.cwd(), "data", "status.json")
@@ -116,14 +134,25 @@ export async function GET() {
       fs.mkdirSync(dataDir, { recursive: true })
     }
 
+    // Prefer the latest-state snapshot; fall back to status + terminal log for older pipelines
+    const latestState = getLatestState()
+    const hasSnapshot = latestState && latestState.sample
+
     // Get system status
-    const systemStatus = getSystemStatus()
+    const systemStatus = hasSnapshot ? latestState : getSystemStatus()
 
     // Get latest real data
-    const latestData = getLatestDataFromTerminalLog()
+    const latestData = hasSnapshot ? latestState.sample : getLatestDataFromTerminalLog()
 
     // Get recent predictions
-    const predictions = getRecentPredictions()
+    const predictions = hasSnapshot
+      ? (latestState.predictions || []).map((pred: any) => ({
+          timestamp: pred.timestamp,
+          predicted_power: pred.predicted_power,
+          method: pred.method || "Unknown",
+          confidence: pred.confidence || 0,
+        }))
+      : getRecentPredictions()
 
     // Build dashboard data
     const dashboardData: DashboardData = latestData
@@ -25,9 +25,14 @@ export async function POST() {
     const pythonScriptPath = path.join(process.cwd(), "python", "solar_monitoring.py")
 
     // Start Python process
+    // Log volume is controlled by SOLAR_LOG_* variables; production defaults to quiet mode
     pythonProcess = spawn("python", [pythonScriptPath], {
       cwd: process.cwd(),
       stdio: ["pipe", "pipe", "pipe"],
+      env: {
+        SOLAR_LOG_MODE: process.env.NODE_ENV === "production" ? "quiet" : "verbose",
+        ...process.env,
+      },
     })
 
     // Handle Python process output
@@ -1,12 +1,37 @@
 """
 PowerAI Model Diagnostic Tool
 This script will help identify why your model is not loading
+
+    python diagnose_model_issue.py              # environment + model loading checks
+    python diagnose_model_issue.py --profile    # performance report (data/performance_report.json)
 """
+import argparse
+import json
 import os
+import platform
+import statistics
+import subprocess
 import sys
+import time
 import traceback
+from datetime import datetime
 from pathlib import Path
 
+# Model registry used by python/solar_monitoring_with_model.py
+sys.path.insert(0, str(Path(__file__).resolve().parent / "python"))
+REGISTRY_DIR = Path("python") / "models" / "registry"
+
+# Performance profile settings
+PERFORMANCE_REPORT_PATH = Path("data") / "performance_report.json"
+PROFILE_BATCH_SIZES = [1, 4, 16, 64, 256, 1024]
+PROFILE_SECONDS_PER_BATCH = 2.0  # Time budget per batch size and thread setting
+PROFILE_MIN_RUNS = 5
+PROFILE_WARMUP_RUNS = 3
+PROFILE_DEFAULT_SEQ_LENGTH = 96
+PROFILE_RESULT_PREFIX = "PROFILE_RESULT "
+# Batch recommendation: smallest batch reaching this share of the best throughput
+THROUGHPUT_TARGET_SHARE = 0.9
+
 def check_python_environment():
     """Check Python and package versions"""
     print("🔍 PYTHON ENVIRONMENT CHECK")
@@ -30,11 +55,43 @@ def check_python_environment():
         except Exception as e:
             print(f"⚠️ {package}: ERROR - {e}")
 
+def check_registered_models():
+    """List models from the registry manifests (no filesystem scan, no model loading)"""
+    if not (REGISTRY_DIR / "index.json").exists():
+        return []
+    
+    from model_registry import ModelRegistry
+    registry = ModelRegistry(str(REGISTRY_DIR))
+    serving = registry.serving()
+    
+    print(f"📒 Model registry: {REGISTRY_DIR}")
+    paths = []
+    for version in registry.versions():
+        manifest = registry.get(version)
+        path = registry.artifact_path(manifest)
+        marker = "🚀" if serving and serving["version"] == version else "  "
+        status = "✅" if os.path.exists(path) else "❌ missing"
+        print(f"{marker} {version}: {path} {status}")
+        print(f"      input={manifest['input_shape']} output={manifest['output_shape']} "
+              f"validated={manifest['validated']} metrics={manifest['validation_metrics']}")
+        if os.path.exists(path):
+            paths.append(path)
+    
+    # Serving model first so it is the one tested
+    if serving:
+        serving_path = registry.artifact_path(serving)
+        paths.sort(key=lambda p: p != serving_path)
+    return paths
+
 def check_model_files():
     """Check for model files in common locations"""
     print("\n🔍 MODEL FILES CHECK")
     print("=" * 50)
     
+    registered = check_registered_models()
+    if registered:
+        return registered
+    
     # Common model file locations
     model_paths = [
         "models/best_model.keras",
@@ -180,6 +237,202 @@ def suggest_solutions():
     print("   - Model might be corrupted")
     print("   - Try loading with custom_objects=None")
 
+# ------------------ PERFORMANCE PROFILE ------------------
+def default_thread_settings():
+    """(intra_op, inter_op) pairs to compare; (0, 0) is TensorFlow's own default"""
+    cores = os.cpu_count() or 1
+    intra_values = sorted({1, 2, max(1, cores // 2), cores})
+    return [(0, 0)] + [(intra, inter) for intra in intra_values for inter in (1, 2)]
+
+def profile_worker(model_path, intra_op, inter_op, batch_sizes):
+    """Runs in a fresh process (thread settings must precede TF initialization); returns a dict"""
+    from quantize_models import current_rss_mb, peak_rss_mb, round_mb, rss_delta_mb
+    import numpy as np
+    
+    result = {"intra_op_threads": intra_op, "inter_op_threads": inter_op}
+    rss_start = current_rss_mb()
+    
+    start = time.perf_counter()
+    import tensorflow as tf
+    result["import_s"] = round(time.perf_counter() - start, 3)
+    result["tensorflow_version"] = tf.__version__
+    if intra_op:
+        tf.config.threading.set_intra_op_parallelism_threads(intra_op)
+    if inter_op:
+        tf.config.threading.set_inter_op_parallelism_threads(inter_op)
+    rss_after_import = current_rss_mb()
+    
+    # Cold load pays for graph tracing and file reads; the warm load reuses both
+    start = time.perf_counter()
+    model = tf.keras.models.load_model(model_path, compile=False)
+    result["load_cold_s"] = round(time.perf_counter() - start, 3)
+    rss_after_load = current_rss_mb()
+    start = time.perf_counter()
+    tf.keras.models.load_model(model_path, compile=False)
+    result["load_warm_s"] = round(time.perf_counter() - start, 3)
+    
+    result["memory"] = {
+        "rss_start_mb": round_mb(rss_start),
+        "tensorflow_import_mb": round_mb(rss_delta_mb(rss_start, rss_after_import)),
+        "model_load_mb": round_mb(rss_delta_mb(rss_after_import, rss_after_load)),
+        "model_parameters": int(model.count_params()),
+        "model_weights_mb": round(sum(w.numpy().nbytes for w in model.weights) / (1024 * 1024), 3)
+    }
+    
+    seq_length = model.input_shape[1] or PROFILE_DEFAULT_SEQ_LENGTH
+    n_features = model.input_shape[2] or 1
+    rng = np.random.default_rng(0)
+    
+    result["batches"] = []
+    for batch_size in batch_sizes:
+        batch = tf.constant(rng.random((batch_size, seq_length, n_features), dtype=np.float32))
+        for _ in range(PROFILE_WARMUP_RUNS):
+            model(batch, training=False)
+        
+        latencies = []
+        deadline = time.perf_counter() + PROFILE_SECONDS_PER_BATCH
+        while len(latencies) < PROFILE_MIN_RUNS or time.perf_counter() < deadline:
+            start = time.perf_counter()
+            model(batch, training=False).numpy()
+            latencies.append(time.perf_counter() - start)
+        
+        latencies = np.asarray(latencies) * 1000
+        result["batches"].append({
+            "batch_size": batch_size,
+            "runs": len(latencies),
+            "latency_ms_p50": round(float(np.percentile(latencies, 50)), 3),
+            "latency_ms_p99": round(float(np.percentile(latencies, 99)), 3),
+            "windows_per_s": round(batch_size / (float(np.mean(latencies)) / 1000), 1)
+        })
+    
+    result["memory"]["peak_rss_mb"] = round_mb(peak_rss_mb())
+    return result
+
+def run_profile_worker(model_path, intra_op, inter_op, batch_sizes):
+    """Spawn one profiling process; returns its result dict or {"error": ...}"""
+    command = [sys.executable, os.path.abspath(__file__), "--profile-worker", "--model", model_path,
+               "--threads", f"{intra_op}:{inter_op}",
+               "--batch-sizes", ",".join(str(b) for b in batch_sizes)]
+    env = {**os.environ, "TF_CPP_MIN_LOG_LEVEL": "2"}
+    completed = subprocess.run(command, capture_output=True, text=True, env=env)
+    for line in completed.stdout.splitlines():
+        if line.startswith(PROFILE_RESULT_PREFIX):
+            return json.loads(line[len(PROFILE_RESULT_PREFIX):])
+    return {"intra_op_threads": intra_op, "inter_op_threads": inter_op,
+            "error": (completed.stderr or completed.stdout).strip().splitlines()[-1:] or ["no output"]}
+
+def recommend_configuration(runs):
+    """Best thread setting for single-window latency, and thread/batch pair for throughput"""
+    runs = [r for r in runs if "error" not in r]
+    if not runs:
+        return None
+    
+    def batch_stats(run, batch_size):
+        return next((b for b in run["batches"] if b["batch_size"] == batch_size), None)
+    
+    smallest_batch = min(b["batch_size"] for b in runs[0]["batches"])
+    realtime = min(runs, key=lambda r: batch_stats(r, smallest_batch)["latency_ms_p50"])
+    
+    best_run, best_batch = max(((r, b) for r in runs for b in r["batches"]), key=lambda rb: rb[1]["windows_per_s"])
+    # Past the knee of the curve, bigger batches only add latency
+    target = best_batch["windows_per_s"] * THROUGHPUT_TARGET_SHARE
+    knee = min((b for b in best_run["batches"] if b["windows_per_s"] >= target), key=lambda b: b["batch_size"])
+    
+    return {
+        "realtime": {
+            "intra_op_threads": realtime["intra_op_threads"],
+            "inter_op_threads": realtime["inter_op_threads"],
+            "batch_size": smallest_batch,
+            "latency_ms_p50": batch_stats(realtime, smallest_batch)["latency_ms_p50"]
+        },
+        "throughput": {
+            "intra_op_threads": best_run["intra_op_threads"],
+            "inter_op_threads": best_run["inter_op_threads"],
+            "batch_size": knee["batch_size"],
+            "windows_per_s": knee["windows_per_s"],
+            "latency_ms_p99": knee["latency_ms_p99"],
+            "max_windows_per_s": best_batch["windows_per_s"]
+        },
+        "note": "0 threads = TensorFlow default. Use the throughput batch size as inference_server.py --max-batch."
+    }
+
+def run_performance_profile(model_path, report_path=PERFORMANCE_REPORT_PATH, batch_sizes=None, thread_settings=None):
+    """Profile import/load time, latency, throughput and memory; writes a JSON report"""
+    print("\n🔍 PERFORMANCE PROFILE")
+    print("=" * 50)
+    batch_sizes = batch_sizes or PROFILE_BATCH_SIZES
+    thread_settings = thread_settings or default_thread_settings()
+    
+    runs = []
+    for intra_op, inter_op in thread_settings:
+        print(f"⏱️ intra_op={intra_op or 'default'} inter_op={inter_op or 'default'} ...")
+        run = run_profile_worker(model_path, intra_op, inter_op, batch_sizes)
+        runs.append(run)
+        if "error" in run:
+            print(f"❌ Profiling failed: {run['error']}")
+            continue
+        for b in run["batches"]:
+            print(f"   batch {b['batch_size']:>5}: p50 {b['latency_ms_p50']:>9.3f} ms  "
+                  f"p99 {b['latency_ms_p99']:>9.3f} ms  {b['windows_per_s']:>10.1f} windows/s")
+    
+    ok_runs = [r for r in runs if "error" not in r]
+    # The first process pays for reading TF from disk; later ones hit the OS page cache
+    import_times = [r["import_s"] for r in ok_runs]
+    import_s = {"cold": import_times[0],
+                "warm": statistics.median(import_times[1:]) if len(import_times) > 1 else None} if ok_runs else None
+    report = {
+        "created_at": datetime.now().isoformat(),
+        "host": {
+            "hostname": platform.node(),
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+            "python": platform.python_version(),
+            "tensorflow": ok_runs[0]["tensorflow_version"] if ok_runs else None
+        },
+        "model": {"path": model_path, "size_mb": round(os.path.getsize(model_path) / (1024 * 1024), 3)
+                  if os.path.isfile(model_path) else None},
+        "import_s": import_s,
+        "load_s": {"cold": ok_runs[0]["load_cold_s"], "warm": ok_runs[0]["load_warm_s"]} if ok_runs else None,
+        "memory": {
+            **ok_runs[0]["memory"],
+            "peak_rss_mb": max((r["memory"]["peak_rss_mb"] for r in ok_runs
+                                if r["memory"]["peak_rss_mb"] is not None), default=None)
+        } if ok_runs else None,
+        "runs": runs,
+        "recommended": recommend_configuration(runs)
+    }
+    
+    report_path = Path(report_path)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+    
+    recommended = report["recommended"]
+    if recommended:
+        rt, tp = recommended["realtime"], recommended["throughput"]
+        print(f"✅ Realtime: intra_op={rt['intra_op_threads']} inter_op={rt['inter_op_threads']} "
+              f"(p50 {rt['latency_ms_p50']} ms)")
+        print(f"✅ Throughput: intra_op={tp['intra_op_threads']} inter_op={tp['inter_op_threads']} "
+              f"batch={tp['batch_size']} ({tp['windows_per_s']} windows/s)")
+    print(f"📝 Report written to: {report_path}")
+    return report
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="PowerAI model diagnostic tool")
+    parser.add_argument("--profile", action="store_true", help="Profile the model and write a JSON performance report")
+    parser.add_argument("--model", help="Model to profile (default: first working model found)")
+    parser.add_argument("--report", default=str(PERFORMANCE_REPORT_PATH))
+    parser.add_argument("--batch-sizes", help="Comma-separated batch sizes (default: 1,4,16,64,256,1024)")
+    parser.add_argument("--threads", help="Comma-separated intra:inter settings, e.g. 0:0,4:1 (default: derived from cores)")
+    parser.add_argument("--profile-worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    args.batch_sizes = [int(b) for b in args.batch_sizes.split(",")] if args.batch_sizes else None
+    args.threads = ([tuple(int(v) for v in t.split(":")) for t in args.threads.split(",")]
+                    if args.threads else None)
+    return args
+
 def main():
     """Main diagnostic function"""
     print("🚀 POWERAI MODEL DIAGNOSTIC TOOL")
@@ -195,6 +448,7 @@ def main():
     model_files = check_model_files()
     
     # Step 4: Test loading each found model
+    working_model = None
     if model_files:
         print(f"\n🔍 TESTING {len(model_files)} MODEL FILE(S)")
         print("=" * 50)
@@ -203,6 +457,7 @@ def main():
             success = test_model_loading(model_path)
             if success:
                 print(f"✅ WORKING MODEL FOUND: {model_path}")
+                working_model = model_path
                 break
         else:
             print("❌ No working models found")
@@ -215,6 +470,19 @@ def main():
     print("\n" + "=" * 60)
     print("🔍 Diagnosis complete! Check the results above.")
     print("📧 Share this output to get specific help.")
+    return working_model
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.profile_worker:
+        intra_op, inter_op = args.threads[0]
+        result = profile_worker(args.model, intra_op, inter_op, args.batch_sizes or PROFILE_BATCH_SIZES)
+        print(PROFILE_RESULT_PREFIX + json.dumps(result))
+    elif args.profile:
+        model_path = args.model or main()
+        if model_path:
+            run_performance_profile(model_path, args.report, args.batch_sizes, args.threads)
+        else:
+            print("❌ No working model to profile")
+    else:
+        main()
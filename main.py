@@ -2,55 +2,63 @@
 import pandas as pd
 import numpy as np
 import os
+import sys
 from datetime import timedelta
 from sklearn.preprocessing import MinMaxScaler
 from tensorflow.keras.models import Sequential, load_model
 from tensorflow.keras.layers import LSTM, Dense
 
+# Shared pipeline modules live next to the live monitoring script
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "python"))
+from partitioned_store import PartitionedStore
+from training_data import load_power_series_from_store, make_window_dataset
+
 # ------------------ CONFIGURATION ------------------
 INPUT_EXCEL = "InverterSA1ES111K4H349-Detailed Data-20250630.xlsx"
 MODEL_PATH = "Model_LSTM_learning_with data transformation method_with early stopping_with ressampling_1min then15min.keras"
-REAL_DATA_PATH = "full_training_data.csv"
+REAL_DATA_PATH = "full_training_data.csv"  # Legacy flat history - imported once into REAL_DATA_DIR
+REAL_DATA_DIR = "data/main_real_data"  # This script's own day partitions (not the live pipeline's data/real_data)
+RETRAIN_WINDOW_DAYS = 30
 PREDICTION_PATH = "prediction.csv"
 SEQ_LENGTH = 96  # 24h = 96 samples (15min interval)
 PREDICTION_HORIZON = 4  # 1h ahead = 4 steps
+RETRAIN_EPOCHS = 1
+
+REAL_DATA_STORE = None
 
 # ------------------ INIT FILES ------------------
 def init_files():
+    global REAL_DATA_STORE
     os.makedirs("Prediction", exist_ok=True)
-    if not os.path.exists(REAL_DATA_PATH):
-        pd.DataFrame(columns=["timestamp", "real_power"]).to_csv(REAL_DATA_PATH, index=False)
+    REAL_DATA_STORE = PartitionedStore(REAL_DATA_DIR, ["timestamp", "real_power"])
+    if REAL_DATA_STORE.is_empty() and os.path.exists(REAL_DATA_PATH):
+        REAL_DATA_STORE.import_csv(REAL_DATA_PATH)
     if not os.path.exists(PREDICTION_PATH):
         pd.DataFrame(columns=["timestamp", "predicted_power"]).to_csv(PREDICTION_PATH, index=False)
 
-# ------------------ CREATE SEQUENCES ------------------
-def create_sequences(values, seq_length, horizon):
-    X, y = [], []
-    for i in range(len(values) - seq_length - horizon + 1):
-        X.append(values[i:i + seq_length])
-        y.append(values[i + seq_length:i + seq_length + horizon])
-    return np.array(X), np.array(y)
-
 # ------------------ RETRAIN MODEL ------------------
 def retrain_model():
-    df = pd.read_csv(REAL_DATA_PATH)
-    if len(df) < SEQ_LENGTH + PREDICTION_HORIZON:
+    # Read only the partitions inside the retraining window
+    REAL_DATA_STORE.flush()
+    values = load_power_series_from_store(REAL_DATA_STORE, RETRAIN_WINDOW_DAYS)
+    if len(values) < SEQ_LENGTH + PREDICTION_HORIZON:
         print("⚠️ Not enough data to retrain.")
         return
 
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-    values = df['real_power'].values
     scaler = MinMaxScaler()
-    scaled = scaler.fit_transform(values.reshape(-1, 1))
+    scaled = scaler.fit_transform(values.reshape(-1, 1)).astype(np.float32)
 
-    X, y = create_sequences(scaled, SEQ_LENGTH, PREDICTION_HORIZON)
-    X = X.reshape(-1, SEQ_LENGTH, 1)
-    y = y.reshape(-1, PREDICTION_HORIZON)
+    # Windows are sliced lazily per batch, so memory stays O(series length)
+    dataset = make_window_dataset(scaled, SEQ_LENGTH, PREDICTION_HORIZON)
 
-    if os.path.exists(MODEL_PATH):
-        model = load_model(MODEL_PATH)
+    if not os.path.exists(MODEL_PATH):
+        print("⚠️ No model to retrain.")
+        return
 
-   
+    # The simulation reloads MODEL_PATH for every prediction, so the saved weights take effect immediately
+    model = load_model(MODEL_PATH)
+    model.fit(dataset, epochs=RETRAIN_EPOCHS, verbose=0)
+    model.save(MODEL_PATH)
     print("🔁✅ Model retrained after 24 hours of data.\n")
 
 # ------------------ REAL-TIME SIMULATION ------------------
@@ -86,7 +94,7 @@ def run_realtime_simulation():
 
     for idx, row in df_raw.iterrows():
         buffer.append(row)
-        pd.DataFrame([row[['timestamp', 'real_power']]]).to_csv(REAL_DATA_PATH, mode='a', header=False, index=False)
+        REAL_DATA_STORE.append([{'timestamp': row['timestamp'], 'real_power': row['real_power']}])
 
         print(f"\n🟢 Row {idx + 1} ➜ Time: {row['timestamp']}")
         print(f"   🔸 Power(W): {row['real_power']}")
@@ -120,6 +128,8 @@ def run_realtime_simulation():
             retrain_model()
             retrained = True
 
+    REAL_DATA_STORE.flush()
+
 # ------------------ RUN EVERYTHING ------------------
 if __name__ == "__main__":
     init_files()
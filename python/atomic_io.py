@@ -0,0 +1,39 @@
+# ------------------ IMPORTS ------------------
+import json
+import os
+import tempfile
+
+
+# ------------------ ATOMIC WRITES ------------------
+def write_bytes_atomic(path, payload):
+    """Write bytes to path via a temp file + rename so readers never see a partial file"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        # os.replace is atomic on POSIX and Windows when both paths share a filesystem
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_json_atomic(path, data):
+    """Serialize data as compact JSON and publish it atomically"""
+    payload = json.dumps(data, separators=(',', ':'), default=str).encode('utf-8')
+    write_bytes_atomic(path, payload)
+
+
+def read_json(path, default=None):
+    """Read a JSON file, returning default if it is missing or unreadable"""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
@@ -0,0 +1,74 @@
+# ------------------ IMPORTS ------------------
+import os
+
+import pandas as pd
+
+from atomic_io import read_json, write_json_atomic
+from pipeline_logging import get_logger
+
+# ------------------ CONFIGURATION ------------------
+CHECKPOINT_VERSION = 4  # 2: sinks are partitioned-store snapshots; 3: forecasts are slot overwrites, not a sink;
+                        # 4: the real-data snapshot covers only the simulated (default) inverter
+CHECKPOINT_EVERY_ROWS = 25
+
+SYSTEM_LOG = get_logger("system")
+
+
+# ------------------ SAVE / LOAD ------------------
+def save_checkpoint(path, state):
+    """Atomically write a checkpoint (state must be JSON-serializable)"""
+    write_json_atomic(path, {"version": CHECKPOINT_VERSION, **state})
+
+
+def load_checkpoint(path):
+    """Return the checkpoint dict, or None if missing, unreadable or from another version"""
+    checkpoint = read_json(path)
+    if not checkpoint or checkpoint.get("version") != CHECKPOINT_VERSION:
+        return None
+    return checkpoint
+
+
+def clear_checkpoint(path):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+# ------------------ BUFFER SERIALIZATION ------------------
+def serialize_rows(rows):
+    """Buffer rows (dicts with a pandas timestamp) -> JSON-friendly dicts"""
+    return [{**row, "timestamp": row["timestamp"].isoformat()} for row in rows]
+
+
+def deserialize_rows(rows):
+    return [{**row, "timestamp": pd.Timestamp(row["timestamp"])} for row in rows]
+
+
+# ------------------ SOURCE CACHE ------------------
+def file_signature(path):
+    stat = os.stat(path)
+    return [os.path.abspath(path), stat.st_size, stat.st_mtime_ns]
+
+
+def load_frame_cached(source_path, loader, cache_path=None):
+    """Return loader(source_path), reusing a pickled copy while the source file is unchanged
+
+    Parsing the Excel export dominates restart time; the pickle loads in milliseconds.
+    """
+    cache_path = cache_path or f"{source_path}.cache.pkl"
+    signature = file_signature(source_path)
+
+    if os.path.exists(cache_path):
+        try:
+            cached = pd.read_pickle(cache_path)
+            if cached.get("signature") == signature:
+                return cached["frame"]
+        except Exception:
+            pass
+
+    frame = loader(source_path)
+    if frame is not None:
+        try:
+            pd.to_pickle({"signature": signature, "frame": frame}, cache_path)
+        except Exception as e:
+            SYSTEM_LOG.warning(f"⚠️ Could not cache parsed data: {e}")
+    return frame
@@ -0,0 +1,96 @@
+# ------------------ IMPORTS ------------------
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# ------------------ CONFIGURATION ------------------
+CACHE_MAX_ENTRIES = 4096
+CACHE_MAX_AGE_SECONDS = 6 * 3600
+CACHE_QUANTIZATION_STEP = 1e-3  # Scaled windows are in [0, 1]; 1e-3 is ~0.1% of the window range
+
+
+# ------------------ MODEL VERSION ------------------
+def model_version(model_path):
+    """Cheap identity of a model file (path, size, mtime) used as part of the cache key"""
+    stat = os.stat(model_path)
+    return f"{os.path.abspath(model_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+# ------------------ FORECAST CACHE ------------------
+class ForecastCache:
+    """Bounded LRU cache of scaled model outputs keyed by quantized scaled input windows"""
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, max_age_seconds=CACHE_MAX_AGE_SECONDS,
+                 quantization_step=CACHE_QUANTIZATION_STEP):
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self.quantization_step = quantization_step
+
+        self._entries = OrderedDict()  # key -> (inserted_at, value)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def make_key(self, window, version):
+        """Hash the quantized window together with the model version"""
+        quantized = np.rint(np.asarray(window, dtype=np.float64).ravel() / self.quantization_step)
+        digest = hashlib.blake2b(quantized.astype(np.int32).tobytes(), digest_size=16)
+        digest.update(version.encode('utf-8'))
+        return digest.digest()
+
+    def get(self, key):
+        """Return a cached value or None; refreshes LRU position on hit"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            inserted_at, value = entry
+            if now - inserted_at > self.max_age_seconds:
+                del self._entries[key]
+                self.evictions += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Insert a value, evicting least-recently-used entries beyond max_entries"""
+        value = np.array(value, copy=True)
+        value.setflags(write=False)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Hit/miss counters for the status snapshot"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups * 100, 1) if lookups else 0.0
+            }
+
+
+# Shared by every inverter pipeline running in this process
+FORECAST_CACHE = ForecastCache()
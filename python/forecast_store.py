@@ -0,0 +1,327 @@
+# ------------------ IMPORTS ------------------
+import io
+import os
+from collections import OrderedDict
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from atomic_io import write_bytes_atomic
+from partitioned_store import DEFAULT_INVERTER
+from uncertainty import QUANTILES
+
+# ------------------ CONFIGURATION ------------------
+SLOT_MINUTES = 15
+MAX_OPEN_DAYS = 64  # Memory-mapped day files kept open (LRU)
+
+# Method names are stored as one-byte codes (0 = unknown); issued_at == 0 marks an empty cell
+METHODS = ["LSTM", "Trend-based", "Fallback", "Idle", "LSTM-DayAhead"]
+METHOD_CODES = {name: code for code, name in enumerate(METHODS, start=1)}
+
+FORECAST_DTYPE = np.dtype(
+    [("issued_at", "<i8"), ("method", "u1"), ("predicted_power", "<f4"), ("confidence", "<f4")]
+    + [(f"p{q}", "<f4") for q in QUANTILES]
+)
+VALUE_FIELDS = ["predicted_power", "confidence"] + [f"p{q}" for q in QUANTILES]
+# Sparse records additionally carry their target time (epoch seconds) and steps ahead
+SPARSE_FORECAST_DTYPE = np.dtype([("target", "<i8"), ("horizon", "<u2")] + FORECAST_DTYPE.descr)
+
+
+# ------------------ FORECAST STORE ------------------
+class ForecastStore:
+    """Forecasts indexed by (inverter, target slot, steps ahead) in preallocated per-day arrays
+
+    Each <root>/<inverter>/<YYYY-MM-DD>.npy file is a (slots_per_day, max_horizon)
+    array of FORECAST_DTYPE cells, memory-mapped on access. A forecast for target
+    slot s issued h steps ahead lives at [s, h - 1], so writes and the lookups
+    "latest forecast for a slot" / "forecast issued h steps ahead" touch a fixed
+    number of cells regardless of history length. Re-issuing a forecast for the
+    same cell (another sample in the same slot, or a replay after a restart)
+    overwrites it, which keeps replays idempotent.
+    """
+
+    def __init__(self, root, max_horizon, slot_minutes=SLOT_MINUTES, max_open_days=MAX_OPEN_DAYS):
+        self.root = root
+        self.max_horizon = max_horizon
+        self.slot_minutes = slot_minutes
+        self.slots_per_day = 24 * 60 // slot_minutes
+        self.max_open_days = max_open_days
+        self._open = OrderedDict()  # (inverter, day) -> memmap
+        os.makedirs(root, exist_ok=True)
+
+    # ---------- layout ----------
+    def day_path(self, inverter, day):
+        return os.path.join(self.root, inverter, f"{day}.npy")
+
+    def slot_of(self, timestamp):
+        """(day 'YYYY-MM-DD', slot index) of the slot containing timestamp"""
+        timestamp = pd.Timestamp(timestamp)
+        minutes = timestamp.hour * 60 + timestamp.minute
+        return timestamp.strftime('%Y-%m-%d'), minutes // self.slot_minutes
+
+    def days(self, inverter=DEFAULT_INVERTER):
+        directory = os.path.join(self.root, inverter)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name[:-4] for name in os.listdir(directory) if name.endswith(".npy"))
+
+    def inverters(self):
+        return sorted(name for name in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, name)))
+
+    def _day_array(self, inverter, day, create):
+        key = (inverter, day)
+        if key in self._open:
+            self._open.move_to_end(key)
+            return self._open[key]
+
+        path = self.day_path(inverter, day)
+        if os.path.exists(path):
+            array = np.lib.format.open_memmap(path, mode="r+")
+        elif create:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            array = np.lib.format.open_memmap(path, mode="w+", dtype=FORECAST_DTYPE,
+                                              shape=(self.slots_per_day, self.max_horizon))
+            for field in VALUE_FIELDS:
+                array[field] = np.nan
+        else:
+            return None
+
+        self._open[key] = array
+        if len(self._open) > self.max_open_days:
+            _, evicted = self._open.popitem(last=False)
+            evicted.flush()
+        return array
+
+    # ---------- writes ----------
+    def write(self, issued_at, target_times, predicted_power, method, confidence=np.nan, quantiles=None,
+              inverter=DEFAULT_INVERTER, horizons=None):
+        """Store one forecast set: target_times[i] was forecast horizons[i] (default i + 1) steps ahead"""
+        target_minutes = np.asarray(target_times, dtype="datetime64[m]")
+        horizons = np.arange(1, len(target_minutes) + 1) if horizons is None else np.asarray(horizons)
+        keep = horizons <= self.max_horizon
+        if not keep.all():
+            target_minutes, horizons = target_minutes[keep], horizons[keep]
+
+        cells = np.zeros(len(target_minutes), dtype=FORECAST_DTYPE)
+        cells["issued_at"] = pd.Timestamp(issued_at).value // 1_000_000_000
+        cells["method"] = METHOD_CODES.get(method, 0)
+        cells["predicted_power"] = np.asarray(predicted_power, dtype=np.float32)[keep]
+        cells["confidence"] = np.nan if confidence is None else confidence
+        for i, q in enumerate(QUANTILES):
+            cells[f"p{q}"] = np.nan if quantiles is None else np.asarray(quantiles[i], dtype=np.float32)[keep]
+
+        days = target_minutes.astype("datetime64[D]")
+        slots = (target_minutes - days).astype(np.int64) // self.slot_minutes
+        # A forecast set spans at most a couple of days
+        for day in np.unique(days):
+            in_day = days == day
+            array = self._day_array(inverter, str(day), create=True)
+            rows, cols = slots[in_day], horizons[in_day] - 1
+            # Never let an older issue (out-of-order replay) replace a newer one
+            newer = array["issued_at"][rows, cols] <= cells["issued_at"][in_day]
+            array[rows[newer], cols[newer]] = cells[in_day][newer]
+
+    def flush(self):
+        for array in self._open.values():
+            array.flush()
+
+    # ---------- lookups ----------
+    def _cell_dict(self, cell, target_time, horizon):
+        return {
+            "timestamp": pd.Timestamp(target_time),
+            "horizon": int(horizon),
+            "issued_at": pd.Timestamp(int(cell["issued_at"]), unit="s"),
+            "method": METHODS[cell["method"] - 1] if cell["method"] else None,
+            **{field: float(cell[field]) for field in VALUE_FIELDS}
+        }
+
+    def issued_ahead(self, target_time, horizon, inverter=DEFAULT_INVERTER):
+        """Forecast for target_time's slot issued `horizon` steps ahead, or None"""
+        if not 1 <= horizon <= self.max_horizon:
+            return None
+        day, slot = self.slot_of(target_time)
+        array = self._day_array(inverter, day, create=False)
+        if array is None or not array["issued_at"][slot, horizon - 1]:
+            return None
+        return self._cell_dict(array[slot, horizon - 1], target_time, horizon)
+
+    def latest(self, target_time, inverter=DEFAULT_INVERTER):
+        """Most recently issued forecast for target_time's slot, or None"""
+        day, slot = self.slot_of(target_time)
+        array = self._day_array(inverter, day, create=False)
+        if array is None:
+            return None
+        issued = array["issued_at"][slot]
+        column = int(np.argmax(issued))
+        if not issued[column]:
+            return None
+        return self._cell_dict(array[slot, column], target_time, column + 1)
+
+    def read_day(self, day, inverter=DEFAULT_INVERTER, latest_only=False):
+        """All forecasts targeting one day as a DataFrame (latest_only: one row per slot)"""
+        columns = ["timestamp", "horizon", "issued_at", "method"] + VALUE_FIELDS
+        array = self._day_array(inverter, str(day), create=False)
+        if array is None:
+            return pd.DataFrame(columns=columns)
+
+        if latest_only:
+            cols = np.argmax(array["issued_at"], axis=1)
+            rows = np.nonzero(array["issued_at"][np.arange(self.slots_per_day), cols])[0]
+            cols = cols[rows]
+        else:
+            rows, cols = np.nonzero(array["issued_at"])
+        cells = array[rows, cols]
+
+        start = pd.Timestamp(day)
+        return pd.DataFrame({
+            "timestamp": start + pd.to_timedelta(rows * self.slot_minutes, unit="min"),
+            "horizon": cols + 1,
+            "issued_at": pd.to_datetime(cells["issued_at"], unit="s"),
+            "method": [METHODS[code - 1] if code else None for code in cells["method"]],
+            **{field: cells[field] for field in VALUE_FIELDS}
+        }, columns=columns)
+
+    # ---------- retention ----------
+    def prune(self, retention_days, now):
+        """Delete day files that end more than retention_days before `now`"""
+        cutoff = (pd.Timestamp(now) - timedelta(days=retention_days)).strftime('%Y-%m-%d')
+        for inverter in self.inverters():
+            for day in self.days(inverter):
+                if day < cutoff:
+                    self._open.pop((inverter, day), None)
+                    os.remove(self.day_path(inverter, day))
+
+
+# ------------------ SPARSE FORECAST STORE ------------------
+class SparseForecastStore:
+    """Long-horizon forecasts as one record per (issue time, step) in per-issue-day files
+
+    A dense (slots_per_day, max_horizon) grid wastes most of its cells when the
+    horizon spans days and forecasts are issued a few times a day (day-ahead
+    runs), so <root>/<inverter>/<YYYY-MM-DD>.npy instead holds only the records
+    issued that day. Lookups for a target slot read the issue days that can reach
+    it (at most max_horizon slots back). Re-issuing a forecast with the same issue
+    time replaces its records, so replays stay idempotent.
+    """
+
+    def __init__(self, root, max_horizon, slot_minutes=SLOT_MINUTES):
+        self.root = root
+        self.max_horizon = max_horizon
+        self.slot_minutes = slot_minutes
+        os.makedirs(root, exist_ok=True)
+
+    # ---------- layout ----------
+    def day_path(self, inverter, day):
+        return os.path.join(self.root, inverter, f"{day}.npy")
+
+    def days(self, inverter=DEFAULT_INVERTER):
+        directory = os.path.join(self.root, inverter)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name[:-4] for name in os.listdir(directory) if name.endswith(".npy"))
+
+    def inverters(self):
+        return sorted(name for name in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, name)))
+
+    def _read(self, inverter, day):
+        path = self.day_path(inverter, day)
+        if not os.path.exists(path):
+            return np.zeros(0, dtype=SPARSE_FORECAST_DTYPE)
+        return np.load(path)
+
+    def _records_reaching(self, start, end, inverter):
+        """Records whose target lies in [start, end) (epoch seconds), from every issue day that can hold them"""
+        reach = self.max_horizon * self.slot_minutes * 60
+        first, last = np.array([start - reach, end], dtype="datetime64[s]").astype("datetime64[D]")
+        days = [str(d) for d in np.arange(first, last + 1)]
+        records = np.concatenate([self._read(inverter, day) for day in days])
+        return records[(records["target"] >= start) & (records["target"] < end)]
+
+    # ---------- writes ----------
+    def write(self, issued_at, target_times, predicted_power, method, confidence=np.nan, quantiles=None,
+              inverter=DEFAULT_INVERTER, horizons=None):
+        """Store one forecast set: target_times[i] was forecast horizons[i] (default i + 1) steps ahead"""
+        targets = np.asarray(target_times, dtype="datetime64[s]").astype(np.int64)
+        horizons = np.arange(1, len(targets) + 1) if horizons is None else np.asarray(horizons)
+        keep = horizons <= self.max_horizon
+
+        records = np.zeros(int(keep.sum()), dtype=SPARSE_FORECAST_DTYPE)
+        records["target"] = targets[keep]
+        records["horizon"] = horizons[keep]
+        records["issued_at"] = pd.Timestamp(issued_at).value // 1_000_000_000
+        records["method"] = METHOD_CODES.get(method, 0)
+        records["predicted_power"] = np.asarray(predicted_power, dtype=np.float32)[keep]
+        records["confidence"] = np.nan if confidence is None else confidence
+        for i, q in enumerate(QUANTILES):
+            records[f"p{q}"] = np.nan if quantiles is None else np.asarray(quantiles[i], dtype=np.float32)[keep]
+
+        day = pd.Timestamp(issued_at).strftime('%Y-%m-%d')
+        existing = self._read(inverter, day)
+        records = np.concatenate([existing[existing["issued_at"] != records["issued_at"][0]], records]) \
+            if len(records) else existing
+        buffer = io.BytesIO()
+        np.save(buffer, records)
+        write_bytes_atomic(self.day_path(inverter, day), buffer.getvalue())
+
+    def flush(self):
+        """Writes are published atomically as they happen"""
+
+    # ---------- lookups ----------
+    def _record_dict(self, record):
+        return {
+            "timestamp": pd.Timestamp(int(record["target"]), unit="s"),
+            "horizon": int(record["horizon"]),
+            "issued_at": pd.Timestamp(int(record["issued_at"]), unit="s"),
+            "method": METHODS[record["method"] - 1] if record["method"] else None,
+            **{field: float(record[field]) for field in VALUE_FIELDS}
+        }
+
+    def _slot_bounds(self, target_time):
+        slot_seconds = self.slot_minutes * 60
+        start = pd.Timestamp(target_time).floor(f"{self.slot_minutes}min").value // 1_000_000_000
+        return start, start + slot_seconds
+
+    def issued_ahead(self, target_time, horizon, inverter=DEFAULT_INVERTER):
+        """Most recent forecast for target_time's slot issued `horizon` steps ahead, or None"""
+        if not 1 <= horizon <= self.max_horizon:
+            return None
+        records = self._records_reaching(*self._slot_bounds(target_time), inverter)
+        records = records[records["horizon"] == horizon]
+        if not len(records):
+            return None
+        return self._record_dict(records[np.argmax(records["issued_at"])])
+
+    def latest(self, target_time, inverter=DEFAULT_INVERTER):
+        """Most recently issued forecast for target_time's slot, or None"""
+        records = self._records_reaching(*self._slot_bounds(target_time), inverter)
+        if not len(records):
+            return None
+        return self._record_dict(records[np.argmax(records["issued_at"])])
+
+    def read_day(self, day, inverter=DEFAULT_INVERTER, latest_only=False):
+        """All forecasts targeting one day as a DataFrame (latest_only: one row per slot)"""
+        start = pd.Timestamp(day).value // 1_000_000_000
+        records = self._records_reaching(start, start + 86400, inverter)
+        records = np.sort(records, order=["target", "issued_at"])
+        if latest_only and len(records):
+            slots = records["target"] // (self.slot_minutes * 60)
+            last = np.append(slots[1:] != slots[:-1], True)
+            records = records[last]
+
+        return pd.DataFrame({
+            "timestamp": pd.to_datetime(records["target"], unit="s"),
+            "horizon": records["horizon"].astype(int),
+            "issued_at": pd.to_datetime(records["issued_at"], unit="s"),
+            "method": [METHODS[code - 1] if code else None for code in records["method"]],
+            **{field: records[field] for field in VALUE_FIELDS}
+        }, columns=["timestamp", "horizon", "issued_at", "method"] + VALUE_FIELDS)
+
+    # ---------- retention ----------
+    def prune(self, retention_days, now):
+        """Delete issue-day files more than retention_days before `now`"""
+        cutoff = (pd.Timestamp(now) - timedelta(days=retention_days)).strftime('%Y-%m-%d')
+        for inverter in self.inverters():
+            for day in self.days(inverter):
+                if day < cutoff:
+                    os.remove(self.day_path(inverter, day))
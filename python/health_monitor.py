@@ -0,0 +1,182 @@
+# ------------------ IMPORTS ------------------
+import math
+from collections import deque
+
+# ------------------ CONFIGURATION ------------------
+# (low, high) hard limits per channel; None = no limit on that side
+CHANNEL_LIMITS = {
+    'temp_inverter': (None, 75.0),  # ℃ - over-temperature
+    'ac_voltage': (207.0, 253.0),  # V - 230V ±10%
+    'ac_current': (None, None),  # A - z-score only
+    'ac_freq': (49.8, 50.2)  # Hz - frequency drift
+}
+
+ROLLING_WINDOW = 96  # Samples kept per channel for rolling statistics
+Z_SCORE_THRESHOLD = 4.0
+MIN_SAMPLES_FOR_ZSCORE = 20
+
+
+# ------------------ ROLLING CHANNEL ------------------
+class RollingChannel:
+    """Rolling mean/variance (Welford add/remove) and min/max (monotonic deques), O(1) per update"""
+
+    def __init__(self, window=ROLLING_WINDOW):
+        self.window = window
+        self.values = deque()
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self._index = 0
+        self._min_deque = deque()  # (index, value), values increasing
+        self._max_deque = deque()  # (index, value), values decreasing
+
+    def add(self, value):
+        self.values.append(value)
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+        while self._min_deque and self._min_deque[-1][1] >= value:
+            self._min_deque.pop()
+        self._min_deque.append((self._index, value))
+        while self._max_deque and self._max_deque[-1][1] <= value:
+            self._max_deque.pop()
+        self._max_deque.append((self._index, value))
+        self._index += 1
+
+        if len(self.values) > self.window:
+            self._remove(self.values.popleft())
+
+    def _remove(self, value):
+        self.count -= 1
+        if self.count == 0:
+            self.mean = 0.0
+            self.m2 = 0.0
+        else:
+            delta = value - self.mean
+            self.mean -= delta / self.count
+            self.m2 = max(0.0, self.m2 - delta * (value - self.mean))
+
+        oldest = self._index - self.window
+        if self._min_deque and self._min_deque[0][0] < oldest:
+            self._min_deque.popleft()
+        if self._max_deque and self._max_deque[0][0] < oldest:
+            self._max_deque.popleft()
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    @property
+    def minimum(self):
+        return self._min_deque[0][1] if self._min_deque else None
+
+    @property
+    def maximum(self):
+        return self._max_deque[0][1] if self._max_deque else None
+
+    def z_score(self, value):
+        """z-score of value against the current window (None until enough samples)"""
+        std = self.std
+        if self.count < MIN_SAMPLES_FOR_ZSCORE or std == 0:
+            return None
+        return (value - self.mean) / std
+
+
+# ------------------ HEALTH MONITOR ------------------
+class HealthMonitor:
+    """Streaming threshold and z-score anomaly detection for one inverter"""
+
+    def __init__(self, inverter_id="default", limits=None, window=ROLLING_WINDOW,
+                 z_threshold=Z_SCORE_THRESHOLD):
+        self.inverter_id = inverter_id
+        self.limits = limits or CHANNEL_LIMITS
+        self.z_threshold = z_threshold
+        self.channels = {name: RollingChannel(window) for name in self.limits}
+        self.active = set()  # (channel, kind) currently in anomaly
+        self.alert_count = 0
+        self.last_alert = None
+
+    def _check(self, channel, value, stats):
+        low, high = self.limits[channel]
+        if low is not None and value < low:
+            yield "below_limit", {"limit": low}
+        if high is not None and value > high:
+            yield "above_limit", {"limit": high}
+        z = stats.z_score(value)
+        if z is not None and abs(z) > self.z_threshold:
+            yield "z_score", {"z_score": round(z, 2), "rolling_mean": round(stats.mean, 3)}
+
+    def update(self, timestamp, sample):
+        """Feed one sample (dict of channel values); returns newly raised alert events"""
+        alerts = []
+        for channel, stats in self.channels.items():
+            value = sample.get(channel)
+            if value is None or value != value:  # Missing or NaN
+                continue
+            value = float(value)
+
+            # Compare against the window *before* this sample so an outlier doesn't mask itself
+            firing = dict(self._check(channel, value, stats))
+            stats.add(value)
+
+            for kind, details in firing.items():
+                # Only raise on entering an anomaly state, not on every sample while in it
+                if (channel, kind) in self.active:
+                    continue
+                self.active.add((channel, kind))
+                alert = {
+                    "inverter": self.inverter_id,
+                    "timestamp": str(timestamp),
+                    "channel": channel,
+                    "kind": kind,
+                    "value": value,
+                    **details
+                }
+                alerts.append(alert)
+
+            for key in [k for k in self.active if k[0] == channel and k[1] not in firing]:
+                self.active.discard(key)
+
+        if alerts:
+            self.alert_count += len(alerts)
+            self.last_alert = alerts[-1]
+        return alerts
+
+    def state_dict(self):
+        """Window contents and alert state needed to resume after a restart"""
+        return {
+            "channels": {name: list(stats.values) for name, stats in self.channels.items()},
+            "active": sorted(list(key) for key in self.active),
+            "alert_count": self.alert_count,
+            "last_alert": self.last_alert
+        }
+
+    def load_state_dict(self, state):
+        for name, values in state.get("channels", {}).items():
+            if name in self.channels:
+                channel = self.channels[name] = RollingChannel(self.channels[name].window)
+                for value in values:
+                    channel.add(value)
+        self.active = {tuple(key) for key in state.get("active", [])}
+        self.alert_count = state.get("alert_count", 0)
+        self.last_alert = state.get("last_alert")
+
+    def stats(self):
+        """Rolling channel statistics and alert summary for the status snapshot"""
+        return {
+            "inverter": self.inverter_id,
+            "alert_count": self.alert_count,
+            "active_alerts": sorted(f"{channel}:{kind}" for channel, kind in self.active),
+            "last_alert": self.last_alert,
+            "channels": {
+                name: {
+                    "mean": round(stats.mean, 3),
+                    "std": round(stats.std, 3),
+                    "min": stats.minimum,
+                    "max": stats.maximum
+                }
+                for name, stats in self.channels.items()
+            }
+        }
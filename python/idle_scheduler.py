@@ -0,0 +1,167 @@
+# ------------------ IMPORTS ------------------
+import math
+from datetime import timedelta
+
+import numpy as np
+
+# ------------------ SITE CONFIGURATION ------------------
+# Inverter site (Sfax, Tunisia). Timestamps in the inverter export are local time (UTC+1).
+SITE_LATITUDE = 34.74
+SITE_LONGITUDE = 10.76
+SITE_UTC_OFFSET_HOURS = 1
+
+IDLE_POWER_THRESHOLD = 5.0  # W - at or below this the inverter is considered idle
+IDLE_WINDOW = 3  # Consecutive idle samples before switching to idle mode
+MIN_SUN_ELEVATION = -1.0  # Degrees - below this the sun is considered down
+# Degrees - an idle inverter stays idle while the sun is below this (the site's inverter wakes at ~5.3-15°)
+DAWN_SUN_ELEVATION = 5.0
+IDLE_REFRESH_ROWS = 0  # Run full inference every N idle rows (0 = never while idle)
+
+
+# ------------------ SOLAR POSITION ------------------
+def _equation_of_time_and_declination(gamma, cos, sin):
+    """NOAA series terms for fractional year gamma; cos/sin from math (scalars) or numpy (arrays)"""
+    equation_of_time = 229.18 * (
+        0.000075 + 0.001868 * cos(gamma) - 0.032077 * sin(gamma)
+        - 0.014615 * cos(2 * gamma) - 0.040849 * sin(2 * gamma)
+    )
+    declination = (
+        0.006918 - 0.399912 * cos(gamma) + 0.070257 * sin(gamma)
+        - 0.006758 * cos(2 * gamma) + 0.000907 * sin(2 * gamma)
+        - 0.002697 * cos(3 * gamma) + 0.00148 * sin(3 * gamma)
+    )
+    return equation_of_time, declination
+
+
+def solar_elevation(timestamp, latitude=SITE_LATITUDE, longitude=SITE_LONGITUDE,
+                    utc_offset_hours=SITE_UTC_OFFSET_HOURS):
+    """Approximate solar elevation angle (degrees) for a local timestamp (NOAA formulation)"""
+    utc_time = timestamp - timedelta(hours=utc_offset_hours)
+    day_of_year = utc_time.timetuple().tm_yday
+    hour = utc_time.hour + utc_time.minute / 60 + utc_time.second / 3600
+
+    # Fractional year (radians)
+    gamma = 2 * math.pi / 365 * (day_of_year - 1 + (hour - 12) / 24)
+    equation_of_time, declination = _equation_of_time_and_declination(gamma, math.cos, math.sin)
+
+    true_solar_minutes = hour * 60 + equation_of_time + 4 * longitude
+    hour_angle = math.radians(true_solar_minutes / 4 - 180)
+    lat = math.radians(latitude)
+
+    cos_zenith = (math.sin(lat) * math.sin(declination)
+                  + math.cos(lat) * math.cos(declination) * math.cos(hour_angle))
+    cos_zenith = max(-1.0, min(1.0, cos_zenith))
+    return 90 - math.degrees(math.acos(cos_zenith))
+
+
+def solar_elevation_array(timestamps, latitude=SITE_LATITUDE, longitude=SITE_LONGITUDE,
+                          utc_offset_hours=SITE_UTC_OFFSET_HOURS):
+    """Vectorized solar_elevation for an array of local datetime64 timestamps"""
+    utc_time = np.asarray(timestamps, dtype="datetime64[s]") - np.timedelta64(int(utc_offset_hours * 3600), "s")
+    day_start = utc_time.astype("datetime64[D]")
+    day_of_year = (day_start - day_start.astype("datetime64[Y]")).astype(int) + 1
+    hour = (utc_time - day_start).astype(int) / 3600
+
+    gamma = 2 * np.pi / 365 * (day_of_year - 1 + (hour - 12) / 24)
+    equation_of_time, declination = _equation_of_time_and_declination(gamma, np.cos, np.sin)
+
+    true_solar_minutes = hour * 60 + equation_of_time + 4 * longitude
+    hour_angle = np.radians(true_solar_minutes / 4 - 180)
+    lat = np.radians(latitude)
+
+    cos_zenith = (np.sin(lat) * np.sin(declination)
+                  + np.cos(lat) * np.cos(declination) * np.cos(hour_angle))
+    return 90 - np.degrees(np.arccos(np.clip(cos_zenith, -1.0, 1.0)))
+
+
+# ------------------ IDLE SCHEDULER ------------------
+class IdleScheduler:
+    """Decides per row whether the full model needs to run or a zero forecast is enough"""
+
+    def __init__(self, idle_power_threshold=IDLE_POWER_THRESHOLD, idle_window=IDLE_WINDOW,
+                 min_sun_elevation=MIN_SUN_ELEVATION, idle_refresh_rows=IDLE_REFRESH_ROWS,
+                 dawn_sun_elevation=DAWN_SUN_ELEVATION, use_solar_position=True, latitude=SITE_LATITUDE, longitude=SITE_LONGITUDE,
+                 utc_offset_hours=SITE_UTC_OFFSET_HOURS):
+        self.idle_power_threshold = idle_power_threshold
+        self.idle_window = idle_window
+        self.min_sun_elevation = min_sun_elevation
+        self.idle_refresh_rows = idle_refresh_rows
+        self.dawn_sun_elevation = dawn_sun_elevation
+        self.use_solar_position = use_solar_position
+        self.latitude = latitude
+        self.longitude = longitude
+        self.utc_offset_hours = utc_offset_hours
+
+        self.consecutive_idle = 0
+        self.idle_rows = 0
+        self.is_idle = False
+        self.window_idle = False
+        self.sun_elevation = None  # At the newest sample (solar position mode only)
+        self.skipped_inferences = 0
+
+    def _elevation(self, timestamp):
+        return solar_elevation(timestamp, self.latitude, self.longitude, self.utc_offset_hours)
+
+    def _sun_is_down(self, timestamp):
+        return self._elevation(timestamp) < self.min_sun_elevation
+
+    def observe(self, timestamp, power):
+        """Update idle detection with the newest sample; returns True while idle"""
+        if power <= self.idle_power_threshold:
+            self.consecutive_idle += 1
+        else:
+            self.consecutive_idle = 0
+
+        self.window_idle = self.consecutive_idle >= self.idle_window
+        if self.use_solar_position:
+            self.sun_elevation = self._elevation(timestamp)
+        night_idle = (self.use_solar_position and power <= self.idle_power_threshold
+                      and self.sun_elevation < self.min_sun_elevation)
+
+        was_idle = self.is_idle
+        self.is_idle = self.window_idle or night_idle
+        if self.is_idle:
+            self.idle_rows = self.idle_rows + 1 if was_idle else 1
+        else:
+            self.idle_rows = 0
+
+        return self.is_idle
+
+    def should_skip_inference(self, target_times):
+        """True if the model can be skipped and a zero forecast emitted for target_times"""
+        if not self.is_idle:
+            return False
+
+        # Periodic refresh while idle keeps the model output from going stale
+        if self.idle_refresh_rows and self.idle_rows % self.idle_refresh_rows == 0:
+            return False
+
+        # Near dawn the sun rises within the forecast horizon; an inverter that has stayed idle
+        # still produces nothing until the sun clears the wake-up elevation
+        if self.use_solar_position and not all(self._sun_is_down(t) for t in target_times):
+            if not (self.window_idle and self.sun_elevation < self.dawn_sun_elevation):
+                return False
+
+        self.skipped_inferences += 1
+        return True
+
+    def state_dict(self):
+        """Counters needed to resume after a restart"""
+        return {
+            "consecutive_idle": self.consecutive_idle,
+            "idle_rows": self.idle_rows,
+            "is_idle": self.is_idle,
+            "window_idle": self.window_idle,
+            "skipped_inferences": self.skipped_inferences
+        }
+
+    def load_state_dict(self, state):
+        for key, value in state.items():
+            setattr(self, key, value)
+
+    def stats(self):
+        """Scheduler counters for the status snapshot"""
+        return {
+            "idle": self.is_idle,
+            "skipped_inferences": self.skipped_inferences
+        }
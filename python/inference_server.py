@@ -0,0 +1,329 @@
+"""
+Long-lived inference daemon on a Unix domain socket.
+
+Holds one copy of TensorFlow and the LSTM, and batches windows from every
+connected producer into a single model call. Producers use InferenceClient,
+which only needs numpy and the standard library.
+
+Wire format (little-endian, one request/response pair at a time per connection):
+    request   REQUEST_HEADER  magic "SLRQ", version, flags, n_windows, seq_length, reserved
+              payload         n_windows * seq_length float32 (scaled windows)
+    response  RESPONSE_HEADER magic "SLRS", version, status, n_rows, n_cols, payload_bytes
+              payload         n_rows * n_cols float32, or UTF-8 JSON (info / error message)
+
+With FLAG_QUANTILES each row holds the mean forecast followed by the QUANTILES
+rows, flattened; FLAG_INFO returns the model metadata as JSON.
+
+Usage:
+    python inference_server.py [--model PATH] [--socket PATH] [--max-batch 256] [--max-wait-ms 5]
+"""
+# ------------------ IMPORTS ------------------
+import argparse
+import asyncio
+import json
+import os
+import socket
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from uncertainty import MC_SAMPLES, QUANTILES, batch_predict_with_quantiles
+
+# ------------------ CONFIGURATION ------------------
+SOCKET_PATH = os.getenv("SOLAR_INFERENCE_SOCKET", "../data/inference.sock")
+PROTOCOL_VERSION = 1
+REQUEST_MAGIC = b"SLRQ"
+RESPONSE_MAGIC = b"SLRS"
+REQUEST_HEADER = struct.Struct("<4sBBHHH")
+RESPONSE_HEADER = struct.Struct("<4sBBHHI")
+
+FLAG_QUANTILES = 0x01
+FLAG_INFO = 0x02
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+MAX_BATCH_WINDOWS = 256  # Rows per model call (a quantile window takes MC_SAMPLES rows)
+MAX_WAIT_MS = 5  # How long the first request of a batch waits for others to join
+MAX_WINDOWS_PER_REQUEST = 4096
+
+
+# ------------------ WIRE FORMAT ------------------
+def encode_request(windows, flags=0):
+    windows = np.ascontiguousarray(windows, dtype="<f4")
+    n_windows, seq_length = windows.shape
+    header = REQUEST_HEADER.pack(REQUEST_MAGIC, PROTOCOL_VERSION, flags, n_windows, seq_length, 0)
+    return header + windows.tobytes()
+
+
+def encode_response(status, payload=b"", n_rows=0, n_cols=0):
+    if isinstance(payload, np.ndarray):
+        payload = np.ascontiguousarray(payload, dtype="<f4").tobytes()
+    return RESPONSE_HEADER.pack(RESPONSE_MAGIC, PROTOCOL_VERSION, status, n_rows, n_cols, len(payload)) + payload
+
+
+# ------------------ SERVER ------------------
+class PendingRequest:
+    __slots__ = ("windows", "quantiles", "future")
+
+    def __init__(self, windows, quantiles, future):
+        self.windows = windows
+        self.quantiles = quantiles
+        self.future = future
+
+
+class InferenceServer:
+    """Micro-batching model server: concurrent requests share one forward pass"""
+
+    def __init__(self, model, version, socket_path=SOCKET_PATH, max_batch=MAX_BATCH_WINDOWS,
+                 max_wait_ms=MAX_WAIT_MS):
+        self.model = model
+        self.version = version
+        self.socket_path = socket_path
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.seq_length = model.input_shape[1]
+        self.n_outputs = int(np.prod([d for d in model.output_shape[1:] if d is not None]))
+
+        # Model calls run on one worker thread so the event loop keeps accepting requests
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.queue = None
+        self.started_at = time.time()
+        self.clients = 0
+        self.requests = 0
+        self.windows = 0
+        self.batches = 0
+
+    def info(self):
+        return {
+            "version": self.version,
+            "seq_length": self.seq_length,
+            "n_outputs": self.n_outputs,
+            "quantiles": list(QUANTILES),
+            "stats": self.stats()
+        }
+
+    def stats(self):
+        return {
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "clients": self.clients,
+            "requests": self.requests,
+            "windows": self.windows,
+            "batches": self.batches,
+            "avg_windows_per_batch": round(self.windows / self.batches, 2) if self.batches else 0.0
+        }
+
+    # ---------- model ----------
+    def _predict(self, windows, quantiles):
+        if quantiles:
+            outputs = batch_predict_with_quantiles(self.model, windows)
+        else:
+            outputs = np.asarray(self.model(windows, training=False))
+        return outputs.reshape(len(windows), -1)
+
+    def _run_batch(self, batch):
+        """Point and quantile requests run in model calls of at most max_batch rows; one output array per request"""
+        results = [None] * len(batch)
+        for quantiles in (False, True):
+            indices = [i for i, item in enumerate(batch) if item.quantiles == quantiles]
+            if not indices:
+                continue
+            windows = np.concatenate([batch[i].windows for i in indices])[:, :, np.newaxis]
+            # A single request may exceed max_batch; split it so every model call stays within the cap.
+            # Quantile windows are tiled MC_SAMPLES times inside the model call.
+            chunk = max(1, self.max_batch // MC_SAMPLES) if quantiles else self.max_batch
+            outputs = np.concatenate([self._predict(windows[start:start + chunk], quantiles)
+                                      for start in range(0, len(windows), chunk)])
+
+            offset = 0
+            for i in indices:
+                count = len(batch[i].windows)
+                results[i] = outputs[offset:offset + count]
+                offset += count
+        return results
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            n_windows = len(batch[0].windows)
+            deadline = loop.time() + self.max_wait
+            while n_windows < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                n_windows += len(item.windows)
+
+            try:
+                results = await loop.run_in_executor(self.executor, self._run_batch, batch)
+            except Exception as e:
+                for item in batch:
+                    if not item.future.done():
+                        item.future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.windows += n_windows
+            for item, result in zip(batch, results):
+                if not item.future.done():
+                    item.future.set_result(result)
+
+    # ---------- connections ----------
+    async def _handle_request(self, header, reader):
+        magic, version, flags, n_windows, seq_length, _ = REQUEST_HEADER.unpack(header)
+        if magic != REQUEST_MAGIC or version != PROTOCOL_VERSION:
+            raise ConnectionError("Bad request header")
+
+        payload = await reader.readexactly(n_windows * seq_length * 4)
+        if flags & FLAG_INFO:
+            return encode_response(STATUS_OK, json.dumps(self.info()).encode("utf-8"))
+        if n_windows == 0 or n_windows > MAX_WINDOWS_PER_REQUEST or seq_length != self.seq_length:
+            message = f"Expected 1..{MAX_WINDOWS_PER_REQUEST} windows of {self.seq_length}, got {n_windows}x{seq_length}"
+            return encode_response(STATUS_ERROR, message.encode("utf-8"))
+
+        windows = np.frombuffer(payload, dtype="<f4").reshape(n_windows, seq_length)
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put(PendingRequest(windows, bool(flags & FLAG_QUANTILES), future))
+        self.requests += 1
+        try:
+            outputs = await future
+        except Exception as e:
+            return encode_response(STATUS_ERROR, str(e).encode("utf-8"))
+        return encode_response(STATUS_OK, outputs, n_windows, outputs.shape[1])
+
+    async def _handle_client(self, reader, writer):
+        self.clients += 1
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(REQUEST_HEADER.size)
+                except asyncio.IncompleteReadError:
+                    break
+                writer.write(await self._handle_request(header, reader))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            print(f"⚠️ Dropping client: {e}")
+        finally:
+            self.clients -= 1
+            writer.close()
+
+    async def serve_forever(self):
+        self.queue = asyncio.Queue()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)  # Stale socket from a previous run
+        server = await asyncio.start_unix_server(self._handle_client, path=self.socket_path)
+        batcher = asyncio.create_task(self._batch_loop())
+        print(f"🚀 Serving {self.version} on {self.socket_path} (seq={self.seq_length}, outputs={self.n_outputs})")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+            self.executor.shutdown(wait=False)
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+
+# ------------------ CLIENT ------------------
+class InferenceClient:
+    """Blocking client for InferenceServer; imports nothing heavier than numpy"""
+
+    def __init__(self, socket_path=SOCKET_PATH, timeout=30.0):
+        self.socket_path = socket_path
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(socket_path)
+
+        info = self._request(np.empty((0, 0), dtype=np.float32), FLAG_INFO)
+        self.version = info["version"]
+        self.seq_length = info["seq_length"]
+        self.n_outputs = info["n_outputs"]
+        self.quantiles = tuple(info["quantiles"])
+
+    @property
+    def closed(self):
+        return self.sock is None
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def _recv_exactly(self, size):
+        chunks, remaining = [], size
+        while remaining:
+            chunk = self.sock.recv(min(remaining, 1 << 20))
+            if not chunk:
+                raise ConnectionError("Inference server closed the connection")
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b"".join(chunks)
+
+    def _request(self, windows, flags):
+        if self.sock is None:
+            raise ConnectionError("Inference client is closed")
+        try:
+            self.sock.sendall(encode_request(windows, flags))
+            magic, _, status, n_rows, n_cols, size = RESPONSE_HEADER.unpack(self._recv_exactly(RESPONSE_HEADER.size))
+            if magic != RESPONSE_MAGIC:
+                raise ConnectionError("Bad response header")
+            payload = self._recv_exactly(size)
+        except OSError:
+            # A broken connection can't be resynchronized; callers reconnect with a new client
+            self.close()
+            raise
+
+        if status != STATUS_OK:
+            raise RuntimeError(f"Inference server error: {payload.decode('utf-8', 'replace')}")
+        if flags & FLAG_INFO:
+            return json.loads(payload)
+        return np.frombuffer(payload, dtype="<f4").reshape(n_rows, n_cols)
+
+    def predict(self, windows, quantiles=False):
+        """Scaled windows (n, seq) or (n, seq, 1) -> (n, n_outputs), or (n, 1 + len(quantiles), n_outputs)"""
+        windows = np.asarray(windows, dtype=np.float32).reshape(len(windows), -1)
+        outputs = self._request(windows, FLAG_QUANTILES if quantiles else 0)
+        return outputs.reshape(len(windows), 1 + len(self.quantiles), -1) if quantiles else outputs
+
+    def stats(self):
+        return self._request(np.empty((0, 0), dtype=np.float32), FLAG_INFO)["stats"]
+
+
+# ------------------ MAIN ------------------
+def main():
+    parser = argparse.ArgumentParser(description="Shared LSTM inference daemon on a Unix domain socket")
+    parser.add_argument("--model", help="Model file (default: find_model_file())")
+    parser.add_argument("--socket", default=SOCKET_PATH)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH_WINDOWS)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    from tensorflow.keras.models import load_model
+    from forecast_cache import model_version
+
+    model_path = args.model
+    if model_path is None:
+        from pipeline_logging import setup_logging
+        from solar_monitoring_with_model import find_model_file
+        setup_logging()
+        model_path = find_model_file()
+    if model_path is None:
+        print("❌ No model found")
+        return
+
+    model = load_model(model_path, compile=False)
+    server = InferenceServer(model, model_version(model_path), args.socket, args.max_batch, args.max_wait_ms)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print(f"\n🛑 Stopped: {server.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+# ------------------ IMPORTS ------------------
+import argparse
+import hashlib
+import os
+from datetime import datetime
+
+from atomic_io import read_json, write_json_atomic
+
+# ------------------ CONFIGURATION ------------------
+REGISTRY_DIR = "models/registry"
+INDEX_NAME = "index.json"
+MANIFEST_NAME = "manifest.json"
+
+
+# ------------------ CONTENT HASH ------------------
+def content_hash(path, chunk_size=1 << 20):
+    """sha256 of a model file, or of every file in a SavedModel directory"""
+    digest = hashlib.sha256()
+    if os.path.isdir(path):
+        files = sorted(os.path.join(root, f) for root, _, names in os.walk(path) for f in names)
+    else:
+        files = [path]
+    for file_path in files:
+        if os.path.isdir(path):
+            digest.update(os.path.relpath(file_path, path).encode('utf-8'))
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def inspect_model(model_path):
+    """Input/output shapes of a Keras model (loads it once; only used at registration)"""
+    from tensorflow.keras.models import load_model
+    model = load_model(model_path, compile=False)
+    return list(model.input_shape), list(model.output_shape)
+
+
+# ------------------ MODEL REGISTRY ------------------
+class ModelRegistry:
+    """Model manifests in one small index: O(1) lookups without deserializing any model
+
+    index.json holds every manifest plus the serving pointer ("current") and the
+    activation history used for rollback. Each manifest is also written next to
+    the registry entry as <version>/manifest.json.
+    """
+
+    def __init__(self, root=REGISTRY_DIR):
+        self.root = root
+        self.index_path = os.path.join(root, INDEX_NAME)
+        self.index = read_json(self.index_path) or {"current": None, "history": [], "models": {}}
+
+    def _save(self):
+        write_json_atomic(self.index_path, self.index)
+
+    # ---------- lookups ----------
+    def get(self, version):
+        return self.index["models"].get(version)
+
+    def versions(self):
+        return list(self.index["models"])
+
+    def latest_validated(self):
+        """Most recently registered manifest marked as validated, or None"""
+        validated = [m for m in self.index["models"].values() if m.get("validated")]
+        return max(validated, key=lambda m: m["created_at"]) if validated else None
+
+    def serving(self):
+        """Manifest to serve: the activated version, else the latest validated one"""
+        return self.get(self.index["current"]) if self.index["current"] else self.latest_validated()
+
+    def artifact_path(self, manifest):
+        """Absolute path of a manifest's model artifact"""
+        return os.path.normpath(os.path.join(self.root, manifest["model_path"]))
+
+    # ---------- writes ----------
+    def register(self, model_path, version=None, input_shape=None, output_shape=None, horizon=None,
+                 scaler=None, training_data_range=None, validation_metrics=None, validated=False,
+                 extra=None):
+        """Add a model to the registry and return its manifest"""
+        if input_shape is None or output_shape is None:
+            input_shape, output_shape = inspect_model(model_path)
+
+        model_hash = content_hash(model_path)
+        version = version or f"v{len(self.index['models']) + 1}-{model_hash[:8]}"
+        if version in self.index["models"]:
+            raise ValueError(f"Model version already registered: {version}")
+
+        manifest = {
+            "version": version,
+            "model_path": os.path.relpath(os.path.abspath(model_path), os.path.abspath(self.root)),
+            "content_hash": model_hash,
+            "size_bytes": os.path.getsize(model_path) if os.path.isfile(model_path) else None,
+            "input_shape": list(input_shape),
+            "output_shape": list(output_shape),
+            "seq_length": input_shape[1],
+            "horizon": horizon or output_shape[1],
+            "scaler": scaler or {"type": "minmax", "fit": "per_window"},
+            "training_data_range": training_data_range,
+            "validation_metrics": validation_metrics or {},
+            "validated": validated,
+            "created_at": datetime.now().isoformat(),
+            **(extra or {})
+        }
+
+        self.index["models"][version] = manifest
+        write_json_atomic(os.path.join(self.root, version, MANIFEST_NAME), manifest)
+        self._save()
+        return manifest
+
+    def mark_validated(self, version, validation_metrics=None):
+        manifest = self.index["models"][version]
+        manifest["validated"] = True
+        manifest["validation_metrics"].update(validation_metrics or {})
+        write_json_atomic(os.path.join(self.root, version, MANIFEST_NAME), manifest)
+        self._save()
+        return manifest
+
+    def activate(self, version):
+        """Serve `version`; the previous one stays in the history for rollback"""
+        if version not in self.index["models"]:
+            raise KeyError(f"Unknown model version: {version}")
+        self.index["current"] = version
+        self.index["history"].append(version)
+        self._save()
+
+    def rollback(self):
+        """Re-activate the previously served version and return it (None if there is none)"""
+        history = self.index["history"]
+        if len(history) < 2:
+            return None
+        history.pop()
+        self.index["current"] = history[-1]
+        self._save()
+        return self.index["current"]
+
+
+# ------------------ CLI ------------------
+def main():
+    parser = argparse.ArgumentParser(description="Model registry for the solar monitoring LSTM")
+    parser.add_argument("--registry", default=REGISTRY_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    register = commands.add_parser("register", help="Register a model file")
+    register.add_argument("model_path")
+    register.add_argument("--version")
+    register.add_argument("--validated", action="store_true")
+    register.add_argument("--activate", action="store_true")
+
+    commands.add_parser("list", help="List registered models")
+    activate = commands.add_parser("activate", help="Serve a registered version")
+    activate.add_argument("version")
+    commands.add_parser("rollback", help="Re-activate the previously served version")
+
+    args = parser.parse_args()
+    registry = ModelRegistry(args.registry)
+
+    if args.command == "register":
+        manifest = registry.register(args.model_path, version=args.version, validated=args.validated)
+        print(f"✅ Registered {manifest['version']} ({manifest['content_hash'][:12]})")
+        if args.activate:
+            registry.activate(manifest["version"])
+            print(f"🚀 Serving {manifest['version']}")
+    elif args.command == "list":
+        current = registry.index["current"]
+        for version, manifest in registry.index["models"].items():
+            marker = "*" if version == current else " "
+            status = "validated" if manifest.get("validated") else "unvalidated"
+            print(f"{marker} {version}  seq={manifest['seq_length']} horizon={manifest['horizon']}  "
+                  f"{status}  {manifest['validation_metrics']}")
+    elif args.command == "activate":
+        registry.activate(args.version)
+        print(f"🚀 Serving {args.version}")
+    elif args.command == "rollback":
+        version = registry.rollback()
+        print(f"⏪ Serving {version}" if version else "⚠️ Nothing to roll back to")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# ------------------ IMPORTS ------------------
+import numpy as np
+
+# ------------------ CONFIGURATION ------------------
+STEP_MINUTES = 15
+DAY_AHEAD_STEPS = 192  # 48h ahead = 192 steps (15min each)
+
+
+# ------------------ SCALING ------------------
+def scale_windows(windows):
+    """Per-window min-max scaling of a (batch, seq_length) array, vectorized over the batch"""
+    windows = np.asarray(windows, dtype=np.float32)
+    mins = windows.min(axis=1, keepdims=True)
+    ranges = windows.max(axis=1, keepdims=True) - mins
+    # Constant windows scale to 0, like MinMaxScaler does
+    ranges[ranges == 0] = 1.0
+    return (windows - mins) / ranges, mins, ranges
+
+
+# ------------------ ROLLOUT ------------------
+def model_output_steps(model):
+    """Number of forecast steps produced by one model call"""
+    output_shape = model.output_shape
+    return int(np.prod([d for d in output_shape[1:] if d is not None]))
+
+
+def build_rollout_fn(model, steps=DAY_AHEAD_STEPS):
+    """Compile a recursive rollout of the model into a single graph call
+
+    The returned function maps scaled windows (batch, seq_length, 1) to scaled
+    forecasts (batch, steps). Each iteration feeds the model's own outputs back
+    into the window, so a 4-step model reaches 192 steps in 48 iterations that
+    all run inside one tf.function execution.
+    """
+    import tensorflow as tf
+
+    out_steps = model_output_steps(model)
+    seq_length = model.input_shape[1]
+    if seq_length is not None and out_steps > seq_length:
+        raise ValueError(f"Model outputs {out_steps} steps but only sees {seq_length}; cannot roll out")
+    n_iters = -(-steps // out_steps)
+
+    @tf.function(reduce_retracing=True)
+    def rollout(windows):
+        batch_size = tf.shape(windows)[0]
+        outputs = tf.TensorArray(tf.float32, size=n_iters)
+        window = windows
+        for i in tf.range(n_iters):
+            preds = tf.reshape(model(window, training=False), [batch_size, -1])[:, :out_steps]
+            preds = tf.cast(preds, tf.float32)
+            outputs = outputs.write(i, preds)
+            window = tf.concat([window[:, out_steps:, :], preds[:, :, tf.newaxis]], axis=1)
+        # (n_iters, batch, out_steps) -> (batch, n_iters * out_steps)
+        stacked = tf.transpose(outputs.stack(), [1, 0, 2])
+        return tf.reshape(stacked, [batch_size, n_iters * out_steps])[:, :steps]
+
+    return rollout
+
+
+# ------------------ DAY-AHEAD FORECAST ------------------
+def forecast_multi_horizon(model, windows_by_inverter, steps=DAY_AHEAD_STEPS, rollout_fn=None):
+    """Forecast `steps` ahead for many inverters in one batched rollout
+
+    windows_by_inverter maps inverter id -> last seq_length power values (W).
+    Returns inverter id -> array of `steps` non-negative forecasts (W).
+    """
+    if not windows_by_inverter:
+        return {}
+
+    inverter_ids = list(windows_by_inverter)
+    windows = np.stack([np.asarray(windows_by_inverter[i], dtype=np.float32) for i in inverter_ids])
+    scaled, mins, ranges = scale_windows(windows)
+
+    if rollout_fn is None:
+        rollout_fn = build_rollout_fn(model, steps)
+    forecasts_scaled = np.asarray(rollout_fn(scaled[:, :, np.newaxis]))
+
+    forecasts = np.maximum(forecasts_scaled * ranges + mins, 0)
+    return dict(zip(inverter_ids, forecasts))
@@ -0,0 +1,201 @@
+# ------------------ IMPORTS ------------------
+import copy
+import os
+from datetime import timedelta
+
+import pandas as pd
+
+from atomic_io import read_json, write_json_atomic
+
+# ------------------ CONFIGURATION ------------------
+DEFAULT_INVERTER = "default"
+MANIFEST_NAME = "manifest.json"
+DAY_FORMAT = "%Y-%m-%d"
+
+
+# ------------------ PARTITIONED STORE ------------------
+class PartitionedStore:
+    """Day-partitioned CSV storage: <root>/<inverter>/<YYYY-MM-DD>.csv plus a manifest
+
+    The manifest records rows, byte size and min/max timestamp per partition, so
+    range reads open only the partitions they overlap and retention pruning is a
+    file delete per partition, regardless of how much history is stored.
+    """
+
+    def __init__(self, root, columns, timestamp_column='timestamp'):
+        self.root = root
+        self.columns = list(columns)
+        self.timestamp_column = timestamp_column
+        self.manifest_path = os.path.join(root, MANIFEST_NAME)
+
+        os.makedirs(root, exist_ok=True)
+        self.manifest = read_json(self.manifest_path) or {"columns": self.columns, "partitions": {}}
+        self._dirty = False
+        self._reconcile()
+
+    # ---------- layout ----------
+    def partition_path(self, inverter, day):
+        return os.path.join(self.root, inverter, f"{day}.csv")
+
+    def partitions(self, inverter=DEFAULT_INVERTER):
+        return self.manifest["partitions"].get(inverter, {})
+
+    def is_empty(self):
+        return not any(self.manifest["partitions"].values())
+
+    # ---------- writes ----------
+    def append(self, rows, inverter=DEFAULT_INVERTER):
+        """Append rows (DataFrame or list of dicts) to their day partitions"""
+        df = pd.DataFrame(rows).reindex(columns=self.columns)
+        if df.empty:
+            return
+        timestamps = pd.to_datetime(df[self.timestamp_column])
+        entries = self.manifest["partitions"].setdefault(inverter, {})
+
+        for day, group in df.groupby(timestamps.dt.strftime(DAY_FORMAT), sort=False):
+            path = self.partition_path(inverter, day)
+            entry = entries.get(day)
+            if entry is None:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                entry = entries[day] = {"rows": 0, "bytes": 0, "min_ts": None, "max_ts": None}
+
+            # The file, not the manifest, decides: the manifest may lag behind the disk after a crash
+            new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+            group.to_csv(path, mode='a', header=new_file, index=False)
+
+            group_ts = timestamps.loc[group.index]
+            min_ts, max_ts = group_ts.min().isoformat(), group_ts.max().isoformat()
+            entry["rows"] += len(group)
+            entry["bytes"] = os.path.getsize(path)
+            entry["min_ts"] = min(entry["min_ts"] or min_ts, min_ts)
+            entry["max_ts"] = max(entry["max_ts"] or max_ts, max_ts)
+        self._dirty = True
+
+    def flush(self):
+        """Publish the manifest if it changed since the last flush"""
+        if self._dirty:
+            write_json_atomic(self.manifest_path, self.manifest)
+            self._dirty = False
+
+    # ---------- reads ----------
+    def read_range(self, start=None, end=None, inverter=DEFAULT_INVERTER):
+        """Rows with start <= timestamp <= end, reading only overlapping partitions"""
+        start = pd.Timestamp(start) if start is not None else None
+        end = pd.Timestamp(end) if end is not None else None
+
+        frames = []
+        for day, entry in sorted(self.partitions(inverter).items()):
+            if not entry["rows"]:
+                continue
+            if start is not None and pd.Timestamp(entry["max_ts"]) < start:
+                continue
+            if end is not None and pd.Timestamp(entry["min_ts"]) > end:
+                continue
+            frames.append(pd.read_csv(self.partition_path(inverter, day), parse_dates=[self.timestamp_column]))
+
+        if not frames:
+            return pd.DataFrame(columns=self.columns)
+        df = pd.concat(frames, ignore_index=True)
+        mask = pd.Series(True, index=df.index)
+        if start is not None:
+            mask &= df[self.timestamp_column] >= start
+        if end is not None:
+            mask &= df[self.timestamp_column] <= end
+        return df[mask].reset_index(drop=True)
+
+    def read_tail(self, n_rows, inverter=DEFAULT_INVERTER):
+        """Last n_rows by timestamp, reading partitions newest-first until enough rows are found"""
+        frames, count = [], 0
+        for day, entry in sorted(self.partitions(inverter).items(), reverse=True):
+            if count >= n_rows:
+                break
+            if entry["rows"]:
+                frames.append(pd.read_csv(self.partition_path(inverter, day), parse_dates=[self.timestamp_column]))
+                count += entry["rows"]
+
+        if not frames:
+            return pd.DataFrame(columns=self.columns)
+        df = pd.concat(frames[::-1], ignore_index=True).sort_values(self.timestamp_column, kind='stable')
+        return df.tail(n_rows).reset_index(drop=True)
+
+    def latest_timestamp(self, inverter=DEFAULT_INVERTER):
+        entries = [e["max_ts"] for e in self.partitions(inverter).values() if e["rows"]]
+        return pd.Timestamp(max(entries)) if entries else None
+
+    # ---------- retention ----------
+    def prune(self, retention_days, now):
+        """Delete whole partitions older than retention_days before `now`; returns partitions removed"""
+        cutoff = (pd.Timestamp(now) - timedelta(days=retention_days)).strftime(DAY_FORMAT)
+        removed = 0
+        for inverter, entries in self.manifest["partitions"].items():
+            for day in [d for d in entries if d < cutoff]:
+                path = self.partition_path(inverter, day)
+                if os.path.exists(path):
+                    os.remove(path)
+                del entries[day]
+                removed += 1
+        if removed:
+            self._dirty = True
+        return removed
+
+    # ---------- checkpoints ----------
+    def snapshot(self, inverter=DEFAULT_INVERTER):
+        """Copy of one inverter's partition table, used as that inverter's checkpoint"""
+        return copy.deepcopy(self.partitions(inverter))
+
+    def restore(self, snapshot, inverter=DEFAULT_INVERTER):
+        """Roll one inverter's partitions back to a snapshot: truncate grown files, delete files created after it
+
+        Other inverters' partitions (e.g. written by the watch-folder ingestion) are left alone.
+        """
+        for day in self._partitions_on_disk().get(inverter, []):
+            path = self.partition_path(inverter, day)
+            if day not in snapshot:
+                os.remove(path)
+            elif os.path.getsize(path) > snapshot[day]["bytes"]:
+                with open(path, 'r+b') as f:
+                    f.truncate(snapshot[day]["bytes"])
+        self.manifest["partitions"][inverter] = copy.deepcopy(snapshot)
+        self._dirty = True
+        self.flush()
+
+    def _scan_partition(self, path):
+        df = pd.read_csv(path, usecols=[self.timestamp_column], parse_dates=[self.timestamp_column])
+        timestamps = df[self.timestamp_column]
+        return {
+            "rows": len(df),
+            "bytes": os.path.getsize(path),
+            "min_ts": timestamps.min().isoformat() if len(df) else None,
+            "max_ts": timestamps.max().isoformat() if len(df) else None
+        }
+
+    def _reconcile(self):
+        """Rescan partitions the manifest doesn't match (written or deleted after its last flush)"""
+        on_disk = self._partitions_on_disk()
+        for inverter, entries in self.manifest["partitions"].items():
+            for day in [d for d in entries if d not in on_disk.get(inverter, [])]:
+                del entries[day]
+                self._dirty = True
+        for inverter, days in on_disk.items():
+            entries = self.manifest["partitions"].setdefault(inverter, {})
+            for day in days:
+                path = self.partition_path(inverter, day)
+                entry = entries.get(day)
+                if entry is None or entry["bytes"] != os.path.getsize(path):
+                    entries[day] = self._scan_partition(path)
+                    self._dirty = True
+
+    def _partitions_on_disk(self):
+        found = {}
+        for inverter in os.listdir(self.root):
+            inverter_dir = os.path.join(self.root, inverter)
+            if os.path.isdir(inverter_dir):
+                found[inverter] = [f[:-4] for f in os.listdir(inverter_dir) if f.endswith('.csv')]
+        return found
+
+    # ---------- migration ----------
+    def import_csv(self, path, inverter=DEFAULT_INVERTER, chunksize=100_000):
+        """One-time import of a flat CSV history into day partitions"""
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            self.append(chunk, inverter)
+        self.flush()
@@ -0,0 +1,146 @@
+# ------------------ IMPORTS ------------------
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from datetime import datetime
+
+# ------------------ CONFIGURATION ------------------
+# All settings come from the environment so log volume can change without code changes:
+#   SOLAR_LOG_LEVEL   DEBUG | INFO | WARNING | ERROR      (default INFO)
+#   SOLAR_LOG_MODE    verbose | quiet                      (quiet = WARNING and above only)
+#   SOLAR_LOG_FORMAT  text | json                          (default text)
+#   SOLAR_LOG_SAMPLE  per-category 1-in-N sampling, e.g. "data=10,prediction=10"
+LOGGER_NAME = "solar"
+LOG_QUEUE_SIZE = 10000
+
+_listener = None
+
+
+# ------------------ LOGGERS ------------------
+def get_logger(category):
+    """Logger for one category (system, model, data, prediction, alert)"""
+    return logging.getLogger(f"{LOGGER_NAME}.{category}")
+
+
+def _category(record):
+    return record.name.split(".", 1)[1] if "." in record.name else record.name
+
+
+class LazyText:
+    """Defers building a log message until a record actually passes sampling/level checks"""
+
+    def __init__(self, build):
+        self.build = build
+
+    def __str__(self):
+        return self.build()
+
+
+# ------------------ FILTERS / FORMATTERS ------------------
+class CategorySampler(logging.Filter):
+    """Pass one in every N records per category; warnings and errors are never sampled out"""
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = rates
+        self.counters = {}
+
+    def filter(self, record):
+        rate = self.rates.get(_category(record), 1)
+        if rate <= 1 or record.levelno >= logging.WARNING:
+            return True
+        count = self.counters.get(record.name, 0)
+        self.counters[record.name] = count + 1
+        return count % rate == 0
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; structured values passed via extra={"fields": {...}}"""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(),
+            "level": record.levelname,
+            "category": _category(record),
+            "message": record.getMessage().strip()
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full"""
+
+    dropped = 0
+
+    def prepare(self, record):
+        # Records stay in-process, so message formatting is left to the listener thread
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DroppingQueueHandler.dropped += 1
+
+
+def parse_sample_rates(spec):
+    """'data=10,prediction=5' -> {'data': 10, 'prediction': 5}"""
+    rates = {}
+    for part in filter(None, (p.strip() for p in (spec or "").split(","))):
+        category, _, rate = part.partition("=")
+        try:
+            rates[category.strip()] = max(1, int(rate))
+        except ValueError:
+            pass
+    return rates
+
+
+# ------------------ SETUP ------------------
+def setup_logging(level=None, mode=None, fmt=None, sample=None, stream=None):
+    """Route all pipeline logging through a background queue listener
+
+    The calling (ingestion) thread only filters and enqueues records; formatting
+    and console I/O happen on the listener thread.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    level = (level or os.getenv("SOLAR_LOG_LEVEL", "INFO")).upper()
+    mode = (mode or os.getenv("SOLAR_LOG_MODE", "verbose")).lower()
+    fmt = (fmt or os.getenv("SOLAR_LOG_FORMAT", "text")).lower()
+    sample = sample if sample is not None else os.getenv("SOLAR_LOG_SAMPLE", "")
+    if mode == "quiet":
+        level = "WARNING"
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter("%(message)s"))
+
+    queue_handler = DroppingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+    queue_handler.addFilter(CategorySampler(parse_sample_rates(sample)))
+
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(getattr(logging, level, logging.INFO))
+    logger.handlers = [queue_handler]
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(queue_handler.queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Drain the queue and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
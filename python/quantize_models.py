@@ -0,0 +1,251 @@
+"""
+Reduced-precision model variants and an accuracy-vs-latency harness.
+
+Converts the LSTM found by find_model_file() (or a given .keras file) to TFLite
+float16 and dynamic-range int8 variants, replays full_training_data.csv through
+the float32 Keras model and every variant, and writes a JSON report with error
+deltas, latency, RSS and model size per variant.
+
+Usage:
+    python quantize_models.py [--model PATH] [--max-windows 500]
+"""
+# ------------------ IMPORTS ------------------
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from multi_horizon import scale_windows
+from training_data import load_power_series, window_views
+
+# ------------------ CONFIGURATION ------------------
+DATA_PATH = "../full_training_data.csv"  # Full history; data/full_training_data.csv is a short excerpt
+VARIANTS_DIR = "models/variants"
+REPORT_PATH = "../data/quantization_report.json"
+MAX_WINDOWS = 500
+# A variant is deployable if its mean absolute deviation from float32 stays under this (W)
+MAX_MAE_DELTA_W = 5.0
+
+
+# ------------------ MEMORY ------------------
+def _psutil_memory_info():
+    try:
+        import psutil  # Optional; the RSS source on Windows, where /proc and resource don't exist
+    except ImportError:
+        return None
+    return psutil.Process().memory_info()
+
+
+def _ru_maxrss_mb():
+    try:
+        import resource  # Not available on Windows
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _proc_status_mb(field):
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB (Linux /proc, psutil, else peak RSS); None if unavailable"""
+    rss = _proc_status_mb("VmRSS:")
+    if rss is not None:
+        return rss
+    info = _psutil_memory_info()
+    if info is not None:
+        return info.rss / (1024 * 1024)
+    return _ru_maxrss_mb()
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB; None if unavailable"""
+    peak = _proc_status_mb("VmHWM:")
+    if peak is not None:
+        return peak
+    info = _psutil_memory_info()
+    if info is not None and hasattr(info, "peak_wset"):  # Windows
+        return info.peak_wset / (1024 * 1024)
+    return _ru_maxrss_mb()
+
+
+def rss_delta_mb(before, after):
+    return None if before is None or after is None else after - before
+
+
+def round_mb(value):
+    return None if value is None else round(value, 1)
+
+
+# ------------------ CONVERSION ------------------
+def convert_variant(model, variant):
+    """TFLite flatbuffer for one variant: 'float16' or 'int8' (dynamic-range)"""
+    import tensorflow as tf
+
+    def build(select_ops):
+        converter = tf.lite.TFLiteConverter.from_keras_model(model)
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        if variant == "float16":
+            converter.target_spec.supported_types = [tf.float16]
+        if select_ops:
+            # Some LSTM graphs need TF ops that have no TFLite builtin equivalent
+            converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS,
+                                                   tf.lite.OpsSet.SELECT_TF_OPS]
+            converter._experimental_lower_tensor_list_ops = False
+        return converter.convert()
+
+    try:
+        return build(select_ops=False)
+    except Exception as e:
+        print(f"⚠️ Builtin-only conversion failed for {variant} ({e}); retrying with SELECT_TF_OPS")
+        return build(select_ops=True)
+
+
+class TFLiteRunner:
+    """Minimal single-window runner around tf.lite.Interpreter"""
+
+    def __init__(self, model_path):
+        import tensorflow as tf
+        self.interpreter = tf.lite.Interpreter(model_path=model_path)
+        self.interpreter.allocate_tensors()
+        self.input_index = self.interpreter.get_input_details()[0]["index"]
+        self.output_index = self.interpreter.get_output_details()[0]["index"]
+
+    def predict(self, window):
+        self.interpreter.set_tensor(self.input_index, window)
+        self.interpreter.invoke()
+        return self.interpreter.get_tensor(self.output_index)
+
+
+# ------------------ HARNESS ------------------
+def build_windows(data_path, seq_length, horizon, max_windows):
+    """Scaled input windows plus the actual future power for the latest max_windows windows"""
+    values = load_power_series(data_path)
+    X, y = window_views(values, seq_length, horizon)
+    X, y = X[-max_windows:], y[-max_windows:]
+    scaled, mins, ranges = scale_windows(X)
+    return scaled[:, :, np.newaxis].astype(np.float32), mins, ranges, np.asarray(y, dtype=np.float32)
+
+
+def time_predictions(predict_one, windows):
+    """Run windows one at a time (the serving pattern); returns outputs and per-call latencies (ms)"""
+    outputs, latencies = [], []
+    for window in windows:
+        start = time.perf_counter()
+        outputs.append(np.asarray(predict_one(window[np.newaxis])).reshape(-1))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.stack(outputs), np.asarray(latencies)
+
+
+def summarize(name, outputs_w, baseline_w, actual_w, latencies, rss_mb, size_bytes):
+    horizon = actual_w.shape[1]
+    outputs_w = outputs_w[:, :horizon]
+    return {
+        "variant": name,
+        "size_mb": round(size_bytes / (1024 * 1024), 3) if size_bytes else None,
+        "rss_delta_mb": round_mb(rss_mb),
+        "latency_ms_p50": round(float(np.percentile(latencies, 50)), 3),
+        "latency_ms_p99": round(float(np.percentile(latencies, 99)), 3),
+        "mae_vs_actual_w": round(float(np.mean(np.abs(outputs_w - actual_w))), 3),
+        "mae_delta_vs_float32_w": round(float(np.mean(np.abs(outputs_w - baseline_w[:, :horizon]))), 3),
+        "max_delta_vs_float32_w": round(float(np.max(np.abs(outputs_w - baseline_w[:, :horizon]))), 3)
+    }
+
+
+def run_harness(model_path, data_path=DATA_PATH, max_windows=MAX_WINDOWS, variants=("float16", "int8")):
+    from tensorflow.keras.models import load_model
+
+    rss_before = current_rss_mb()
+    model = load_model(model_path, compile=False)
+    keras_rss = rss_delta_mb(rss_before, current_rss_mb())
+
+    seq_length = model.input_shape[1]
+    horizon = int(np.prod([d for d in model.output_shape[1:] if d is not None]))
+    windows, mins, ranges, actual = build_windows(data_path, seq_length, horizon, max_windows)
+    if len(windows) == 0:
+        raise ValueError(f"Not enough data in {data_path} for windows of {seq_length}+{horizon}")
+    print(f"📊 Replaying {len(windows)} windows (seq={seq_length}, horizon={horizon})")
+
+    def to_watts(outputs_scaled):
+        return np.maximum(outputs_scaled * ranges + mins, 0)
+
+    # float32 Keras baseline - call the model directly to avoid predict() per-call overhead
+    baseline_scaled, latencies = time_predictions(lambda w: model(w, training=False), windows)
+    baseline = to_watts(baseline_scaled)
+    results = [summarize("float32-keras", baseline, baseline, actual, latencies, keras_rss,
+                         os.path.getsize(model_path) if os.path.isfile(model_path) else None)]
+
+    os.makedirs(VARIANTS_DIR, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    for variant in variants:
+        print(f"🔧 Converting {variant}...")
+        variant_path = os.path.join(VARIANTS_DIR, f"{stem}.{variant}.tflite")
+        with open(variant_path, "wb") as f:
+            f.write(convert_variant(model, variant))
+
+        rss_before = current_rss_mb()
+        runner = TFLiteRunner(variant_path)
+        rss = rss_delta_mb(rss_before, current_rss_mb())
+        outputs_scaled, latencies = time_predictions(runner.predict, windows)
+        result = summarize(variant, to_watts(outputs_scaled), baseline, actual, latencies, rss,
+                           os.path.getsize(variant_path))
+        result["path"] = variant_path
+        results.append(result)
+
+    deployable = [r for r in results[1:] if r["mae_delta_vs_float32_w"] <= MAX_MAE_DELTA_W]
+    recommended = min(deployable, key=lambda r: r["size_mb"])["variant"] if deployable else "float32-keras"
+
+    return {
+        "model": model_path,
+        "data": data_path,
+        "windows": len(windows),
+        "max_mae_delta_w": MAX_MAE_DELTA_W,
+        "recommended_variant": recommended,
+        "results": results
+    }
+
+
+# ------------------ MAIN ------------------
+def main():
+    parser = argparse.ArgumentParser(description="Build float16/int8 TFLite variants and compare them")
+    parser.add_argument("--model", help="Model file (default: find_model_file())")
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--max-windows", type=int, default=MAX_WINDOWS)
+    parser.add_argument("--report", default=REPORT_PATH)
+    args = parser.parse_args()
+
+    model_path = args.model
+    if model_path is None:
+        from pipeline_logging import setup_logging
+        from solar_monitoring_with_model import find_model_file
+        setup_logging()
+        model_path = find_model_file()
+    if model_path is None:
+        print("❌ No model found")
+        return
+
+    report = run_harness(model_path, args.data, args.max_windows)
+
+    print(f"\n{'variant':<15}{'size MB':>9}{'RSS MB':>9}{'p50 ms':>9}{'p99 ms':>9}{'MAE W':>9}{'Δ f32 W':>9}")
+    for r in report["results"]:
+        print(f"{r['variant']:<15}{r['size_mb'] or 0:>9.3f}{r['rss_delta_mb'] if r['rss_delta_mb'] is not None else float('nan'):>9.1f}{r['latency_ms_p50']:>9.3f}"
+              f"{r['latency_ms_p99']:>9.3f}{r['mae_vs_actual_w']:>9.2f}{r['mae_delta_vs_float32_w']:>9.2f}")
+    print(f"\n✅ Recommended variant: {report['recommended_variant']}")
+
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"📝 Report written to: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,13 +4,35 @@ import numpy as np
 import os
 import json
 import time
+import argparse
+import signal
 from datetime import datetime, timedelta
 from sklearn.preprocessing import MinMaxScaler
-from tensorflow.keras.models import Sequential, load_model
-from tensorflow.keras.layers import LSTM, Dense
 import warnings
+from atomic_io import write_json_atomic
+from idle_scheduler import IdleScheduler
+from forecast_cache import FORECAST_CACHE, model_version
+from multi_horizon import DAY_AHEAD_STEPS, STEP_MINUTES, forecast_multi_horizon
+from uncertainty import QUANTILES, interval_confidence, predict_with_quantiles
+from health_monitor import HealthMonitor
+from checkpoint import (CHECKPOINT_EVERY_ROWS, clear_checkpoint, deserialize_rows, load_checkpoint,
+                        load_frame_cached, save_checkpoint, serialize_rows)
+from partitioned_store import DEFAULT_INVERTER, PartitionedStore
+from forecast_store import ForecastStore, SparseForecastStore
+from pipeline_logging import LazyText, get_logger, setup_logging
+from model_registry import ModelRegistry
+from inference_server import InferenceClient
+from watch_ingest import POLL_SECONDS, WATCH_DIR, WatchFolder
 warnings.filterwarnings('ignore')
 
+# ------------------ LOGGING ------------------
+# Configured by setup_logging() from SOLAR_LOG_* environment variables (see pipeline_logging.py)
+SYSTEM_LOG = get_logger("system")
+MODEL_LOG = get_logger("model")
+DATA_LOG = get_logger("data")
+PREDICTION_LOG = get_logger("prediction")
+ALERT_LOG = get_logger("alert")
+
 # ------------------ CONFIGURATION ------------------
 INPUT_EXCEL = "InverterSA1ES111K4H349-Detailed Data-20250630.xlsx"
 
@@ -25,61 +47,134 @@ ALTERNATIVE_MODEL_PATHS = [
     "Model_LSTM_learning_with data transformation method_with early stopping_with ressampling_1min then15min.keras"
 ]
 
+# Legacy flat history - imported once into the day-partitioned store below. The old
+# prediction histories (prediction.csv, data/predictions/) have no issue times and are not migrated.
 REAL_DATA_PATH = "../data/full_training_data.csv"
-PREDICTION_PATH = "../data/prediction.csv"
+REAL_DATA_DIR = "../data/real_data"
+FORECAST_DIR = "../data/forecasts"
+DAY_AHEAD_FORECAST_DIR = "../data/forecasts_day_ahead"
 TERMINAL_LOG_PATH = "../data/terminal_log.json"
 STATUS_PATH = "../data/status.json"
+LATEST_STATE_PATH = "../data/latest_state.json"
+CHECKPOINT_PATH = "../data/checkpoint.json"
 
 # 🎯 SEQUENCE PARAMETERS - These will be adjusted based on your model
 SEQ_LENGTH = 96  # Default: 24h = 96 samples (15min interval)
 PREDICTION_HORIZON = 4  # 1h ahead = 4 steps (15min each)
 MIN_DATA_FOR_PREDICTION = 10  # Minimum data points before starting predictions
+MAX_BUFFER_ROWS = 7 * 96  # In-memory history per inverter (one week); everything older is in the stores
+
+# Retention per store (days of data time); older day partitions are deleted at checkpoints
+REAL_DATA_RETENTION_DAYS = 365
+PREDICTION_RETENTION_DAYS = 90
 
 # Global variable to store the actual sequence length from the model
 ACTUAL_SEQ_LENGTH = SEQ_LENGTH
 
+# Loaded models keyed by model version, so each file is deserialized once per process
+LOADED_MODELS = {}
+
+# Shared inference daemon (inference_server.py); when set and reachable, this process never imports TensorFlow
+INFERENCE_SOCKET = os.getenv("SOLAR_INFERENCE_SOCKET")
+INFERENCE_CLIENT = None
+
+# Set by SIGTERM/SIGINT (e.g. /api/stop-simulation) - the loop checkpoints and exits at the next row boundary
+STOP_REQUESTED = False
+
+# Day-partitioned sinks, opened by init_files()
+REAL_DATA_STORE = None
+FORECAST_STORE = None  # Slot-indexed forecasts (inverter, target slot, steps ahead) - see forecast_store.py
+DAY_AHEAD_STORE = None
+
+# Latest-state snapshot served to /api/dashboard-data (status + last sample + last forecast set)
+LATEST_STATE = {"sample": None, "predictions": []}
+
+# Console layout of one data row (DATA_LOG)
+DATA_ROW_FORMAT = (
+    "\n🟢 Row %d ➜ Time: %s\n"
+    "   🔸 Power(W): %.1f\n"
+    "   🔸 Daily Prod(kWh): %.2f\n"
+    "   🔸 AC Current(A): %.1f\n"
+    "   🔸 AC Voltage(V): %.1f\n"
+    "   🔸 Inverter Temp(℃): %.1f\n"
+    "   🔸 Cumulative Prod(kWh): %.1f\n"
+    "   🔸 AC Frequency(Hz): %.2f"
+)
+
 # ------------------ INIT FILES ------------------
 def init_files():
+    global REAL_DATA_STORE, FORECAST_STORE, DAY_AHEAD_STORE
     os.makedirs("../data", exist_ok=True)
     os.makedirs("models", exist_ok=True)
     
-    if not os.path.exists(REAL_DATA_PATH):
-        pd.DataFrame(columns=["timestamp", "real_power"]).to_csv(REAL_DATA_PATH, index=False)
-    if not os.path.exists(PREDICTION_PATH):
-        pd.DataFrame(columns=["timestamp", "predicted_power", "method", "confidence"]).to_csv(PREDICTION_PATH, index=False)
+    REAL_DATA_STORE = PartitionedStore(REAL_DATA_DIR, ["timestamp", "real_power"])
+    FORECAST_STORE = ForecastStore(FORECAST_DIR, PREDICTION_HORIZON)
+    # Day-ahead runs are few and long: one record per issue time x step instead of a dense slot grid
+    DAY_AHEAD_STORE = SparseForecastStore(DAY_AHEAD_FORECAST_DIR, DAY_AHEAD_STEPS)
+    
+    # One-time migration of the flat CSV history
+    if REAL_DATA_STORE.is_empty() and os.path.exists(REAL_DATA_PATH):
+        SYSTEM_LOG.info(f"🔧 Importing {REAL_DATA_PATH} into {REAL_DATA_STORE.root}")
+        REAL_DATA_STORE.import_csv(REAL_DATA_PATH)
 
 # ------------------ UPDATE STATUS ------------------
-def update_status(status, message="", accuracy=0.0, predictions_count=0):
-    """Update system status for web interface"""
+def update_status(status, message="", accuracy=0.0, predictions_count=0, **extra):
+    """Update system status and publish the latest-state snapshot for web interface"""
+    now = datetime.now().isoformat()
     status_data = {
         "status": status,
         "message": message,
-        "timestamp": datetime.now().isoformat(),
-        "last_update": datetime.now().isoformat(),
+        "timestamp": now,
+        "last_update": now,
         "model_accuracy": accuracy,
         "predictions_today": predictions_count,
         "sequence_length": ACTUAL_SEQ_LENGTH,
-        "prediction_horizon": PREDICTION_HORIZON
+        "prediction_horizon": PREDICTION_HORIZON,
+        **extra
     }
+    LATEST_STATE.update(status_data)
     
     try:
-        with open(STATUS_PATH, 'w') as f:
-            json.dump(status_data, f, indent=2)
+        write_json_atomic(STATUS_PATH, status_data)
+        write_json_atomic(LATEST_STATE_PATH, LATEST_STATE)
     except Exception as e:
-        print(f"Error updating status: {e}")
+        SYSTEM_LOG.error(f"Error updating status: {e}")
+
+# ------------------ LATEST STATE ------------------
+def record_latest_sample(sample):
+    """Remember the most recent data row; published with the next status update"""
+    LATEST_STATE["sample"] = sample
+
+def record_latest_predictions(predictions):
+    """Remember the most recent forecast set; published with the next status update"""
+    LATEST_STATE["predictions"] = predictions
 
 # ------------------ FIND MODEL FILE ------------------
 def find_model_file():
     """Find the LSTM model file"""
+    global ACTUAL_SEQ_LENGTH
+    
+    # Registry first: the serving manifest gives the artifact and its shapes without loading it
+    registry = ModelRegistry()
+    manifest = registry.serving()
+    if manifest is not None:
+        registry_path = registry.artifact_path(manifest)
+        if os.path.exists(registry_path):
+            ACTUAL_SEQ_LENGTH = manifest["seq_length"] or SEQ_LENGTH
+            LATEST_STATE["model_version"] = manifest["version"]
+            MODEL_LOG.info(f"✅ Serving registered LSTM model {manifest['version']}: {registry_path}")
+            return registry_path
+        MODEL_LOG.warning(f"⚠️ Registered model {manifest['version']} missing at {registry_path}")
+    
     # Check primary model path
     if os.path.exists(MODEL_PATH):
-        print(f"✅ Found LSTM model: {MODEL_PATH}")
+        MODEL_LOG.info(f"✅ Found LSTM model: {MODEL_PATH}")
         return MODEL_PATH
     
     # Check alternative paths
     for alt_path in ALTERNATIVE_MODEL_PATHS:
         if os.path.exists(alt_path):
-            print(f"✅ Found LSTM model: {alt_path}")
+            MODEL_LOG.info(f"✅ Found LSTM model: {alt_path}")
             return alt_path
     
     # Check for any .keras files in models directory
@@ -88,17 +183,17 @@ def find_model_file():
         keras_files = [f for f in os.listdir(models_dir) if f.endswith('.keras')]
         if keras_files:
             model_file = os.path.join(models_dir, keras_files[0])
-            print(f"✅ Found LSTM model: {model_file}")
+            MODEL_LOG.info(f"✅ Found LSTM model: {model_file}")
             return model_file
     
     # Check current directory
     keras_files = [f for f in os.listdir('.') if f.endswith('.keras')]
     if keras_files:
         model_file = keras_files[0]
-        print(f"✅ Found LSTM model: {model_file}")
+        MODEL_LOG.info(f"✅ Found LSTM model: {model_file}")
         return model_file
     
-    print("⚠️ No LSTM model found. Will use trend-based predictions.")
+    MODEL_LOG.warning("⚠️ No LSTM model found. Will use trend-based predictions.")
     return None
 
 # ------------------ LOAD MODEL SAFELY ------------------
@@ -107,38 +202,67 @@ def load_model_safely(model_path):
     global ACTUAL_SEQ_LENGTH  # 🎯 FIXED: Declare global at the top
     
     try:
-        print(f"🤖 Loading LSTM model from: {model_path}")
+        MODEL_LOG.info(f"🤖 Loading LSTM model from: {model_path}")
+        from tensorflow.keras.models import load_model  # Imported lazily: daemon clients never need TF
         model = load_model(model_path)
         
-        print("📊 Model loaded successfully!")
-        print(f"   Input shape: {model.input_shape}")
-        print(f"   Output shape: {model.output_shape}")
-        print(f"   Total parameters: {model.count_params():,}")
+        MODEL_LOG.info("📊 Model loaded successfully!")
+        MODEL_LOG.info(f"   Input shape: {model.input_shape}")
+        MODEL_LOG.info(f"   Output shape: {model.output_shape}")
+        MODEL_LOG.info(f"   Total parameters: {model.count_params():,}")
         
         # Verify and adjust sequence length based on model
         if model.input_shape[1] is not None:
             model_seq_length = model.input_shape[1]
             if model_seq_length != SEQ_LENGTH:
-                print(f"⚠️ Adjusting sequence length from {SEQ_LENGTH} to {model_seq_length} to match model")
+                MODEL_LOG.warning(f"⚠️ Adjusting sequence length from {SEQ_LENGTH} to {model_seq_length} to match model")
                 ACTUAL_SEQ_LENGTH = model_seq_length
             else:
                 ACTUAL_SEQ_LENGTH = SEQ_LENGTH
-                print(f"✅ Sequence length matches model: {ACTUAL_SEQ_LENGTH}")
+                MODEL_LOG.info(f"✅ Sequence length matches model: {ACTUAL_SEQ_LENGTH}")
         else:
             ACTUAL_SEQ_LENGTH = SEQ_LENGTH
-            print(f"⚠️ Model has dynamic input shape, using default: {ACTUAL_SEQ_LENGTH}")
+            MODEL_LOG.warning(f"⚠️ Model has dynamic input shape, using default: {ACTUAL_SEQ_LENGTH}")
         
         return model
     except Exception as e:
-        print(f"❌ Error loading model: {e}")
+        MODEL_LOG.error(f"❌ Error loading model: {e}")
+        return None
+
+# ------------------ GET MODEL ------------------
+def get_model(model_path):
+    """Return (model, version) for model_path, loading it only once per model version"""
+    version = model_version(model_path)
+    if version not in LOADED_MODELS:
+        LOADED_MODELS.clear()
+        LOADED_MODELS[version] = load_model_safely(model_path)
+    return LOADED_MODELS[version], version
+
+# ------------------ INFERENCE DAEMON ------------------
+def get_inference_client():
+    """Connected InferenceClient if SOLAR_INFERENCE_SOCKET points at a running daemon, else None"""
+    global INFERENCE_CLIENT, ACTUAL_SEQ_LENGTH
+    
+    if not INFERENCE_SOCKET or not os.path.exists(INFERENCE_SOCKET):
         return None
+    if INFERENCE_CLIENT is None or INFERENCE_CLIENT.closed:
+        try:
+            INFERENCE_CLIENT = InferenceClient(INFERENCE_SOCKET)
+        except (OSError, RuntimeError) as e:
+            MODEL_LOG.warning(f"⚠️ Inference daemon unavailable at {INFERENCE_SOCKET}: {e}")
+            INFERENCE_CLIENT = None
+            return None
+        ACTUAL_SEQ_LENGTH = INFERENCE_CLIENT.seq_length
+        LATEST_STATE["inference_daemon"] = INFERENCE_SOCKET
+        MODEL_LOG.info(f"🔌 Using inference daemon {INFERENCE_SOCKET} (seq={ACTUAL_SEQ_LENGTH})")
+    return INFERENCE_CLIENT
 
 # ------------------ PREPARE SEQUENCE DATA ------------------
 def prepare_sequence_data(data_buffer, seq_length):
     """Prepare data sequence for LSTM prediction"""
     try:
         if len(data_buffer) < seq_length:
-            print(f"⚠️ Not enough data for sequence. Need {seq_length}, have {len(data_buffer)}")
+            MODEL_LOG.info(f"⚠️ Not enough data for sequence. Need {seq_length}, have {len(data_buffer)}")
             return None, None
         
         # Get the last seq_length data points
@@ -155,67 +279,73 @@ def prepare_sequence_data(data_buffer, seq_length):
         # Reshape for LSTM input: (batch_size, timesteps, features)
         X_input = scaled_data.reshape(1, seq_length, 1)
         
-        print(f"📊 Prepared sequence: shape={X_input.shape}, range=[{scaled_data.min():.3f}, {scaled_data.max():.3f}]")
+        MODEL_LOG.debug(f"📊 Prepared sequence: shape={X_input.shape}, range=[{scaled_data.min():.3f}, {scaled_data.max():.3f}]")
         
         return X_input, scaler
         
     except Exception as e:
-        print(f"❌ Error preparing sequence data: {e}")
+        MODEL_LOG.error(f"❌ Error preparing sequence data: {e}")
         return None, None
 
 # ------------------ GENERATE LSTM PREDICTIONS ------------------
-def generate_lstm_predictions(model, X_input, scaler, horizon):
+def generate_lstm_predictions(model, X_input, scaler, horizon, version=None):
     """Generate predictions using LSTM model"""
     try:
-        print("🧠 Generating LSTM predictions...")
-        
-        # Make prediction
-        predictions_scaled = model.predict(X_input, verbose=0)
-        print(f"   Raw prediction shape: {predictions_scaled.shape}")
-        
-        # Handle different output shapes
-        if len(predictions_scaled.shape) == 2:
-            # Shape: (1, horizon) - flatten to get horizon values
-            predictions_scaled = predictions_scaled.flatten()
-        elif len(predictions_scaled.shape) == 3:
-            # Shape: (1, horizon, 1) - squeeze to get horizon values
-            predictions_scaled = predictions_scaled.squeeze()
+        MODEL_LOG.debug("🧠 Generating LSTM predictions...")
+        
+        # Reuse the model output for an identical (quantized) scaled window
+        cache_key = FORECAST_CACHE.make_key(X_input, version) if version else None
+        cached = FORECAST_CACHE.get(cache_key) if cache_key else None
+        if cached is not None:
+            outputs_scaled = cached
+            MODEL_LOG.debug("   ♻️ Forecast cache hit")
+        else:
+            # Make prediction - point forecast and quantiles from one batched MC-dropout pass
+            if isinstance(model, InferenceClient):
+                outputs_scaled = model.predict(X_input, quantiles=True)[0]
+            else:
+                outputs_scaled = predict_with_quantiles(model, X_input)
+            MODEL_LOG.debug(f"   Raw prediction shape: {outputs_scaled.shape}")
+            if cache_key:
+                FORECAST_CACHE.put(cache_key, outputs_scaled)
         
         # Ensure we have the right number of predictions
-        if len(predictions_scaled) != horizon:
-            print(f"⚠️ Prediction count mismatch. Expected {horizon}, got {len(predictions_scaled)}")
+        n_outputs = outputs_scaled.shape[1]
+        if n_outputs != horizon:
+            MODEL_LOG.warning(f"⚠️ Prediction count mismatch. Expected {horizon}, got {n_outputs}")
             # Take first 'horizon' predictions or repeat last one
-            if len(predictions_scaled) > horizon:
-                predictions_scaled = predictions_scaled[:horizon]
+            if n_outputs > horizon:
+                outputs_scaled = outputs_scaled[:, :horizon]
             else:
                 # Extend with last value
-                last_val = predictions_scaled[-1] if len(predictions_scaled) > 0 else 0.5
-                predictions_scaled = np.pad(predictions_scaled, (0, horizon - len(predictions_scaled)), 
-                                          mode='constant', constant_values=last_val)
+                outputs_scaled = np.pad(outputs_scaled, ((0, 0), (0, horizon - n_outputs)), mode='edge')
         
         # Inverse transform to get actual power values
-        predictions_scaled = predictions_scaled.reshape(-1, 1)
-        predictions = scaler.inverse_transform(predictions_scaled).flatten()
+        outputs = scaler.inverse_transform(outputs_scaled.reshape(-1, 1)).reshape(outputs_scaled.shape)
         
         # Ensure non-negative values
-        predictions = np.maximum(predictions, 0)
+        outputs = np.maximum(outputs, 0)
+        predictions, quantiles = outputs[0], outputs[1:]
         
-        print(f"   Final predictions: {predictions}")
+        MODEL_LOG.debug(f"   Final predictions: {predictions}")
         
-        # Calculate confidence (simple metric based on prediction variance)
-        confidence = max(0, min(100, 100 - (np.std(predictions) / np.mean(predictions) * 100) if np.mean(predictions) > 0 else 0))
+        # Calculate confidence from the P10-P90 interval width; models without dropout
+        # have no interval, so fall back to the prediction variance metric
+        confidence = interval_confidence(quantiles[0], quantiles[-1], predictions)
+        if confidence is None:
+            confidence = max(0, min(100, 100 - (np.std(predictions) / np.mean(predictions) * 100) if np.mean(predictions) > 0 else 0))
         
-        return predictions, confidence
+        return predictions, confidence, quantiles
         
     except Exception as e:
-        print(f"❌ Error generating LSTM predictions: {e}")
-        return None, 0
+        MODEL_LOG.error(f"❌ Error generating LSTM predictions: {e}")
+        return None, 0, None
 
 # ------------------ GENERATE TREND PREDICTIONS ------------------
 def generate_trend_predictions(data_buffer, horizon):
     """Generate trend-based predictions as fallback"""
     try:
-        print("📈 Generating trend-based predictions...")
+        MODEL_LOG.debug("📈 Generating trend-based predictions...")
         
         # Get recent power values
         recent_count = min(20, len(data_buffer))
@@ -242,12 +372,12 @@ def generate_trend_predictions(data_buffer, horizon):
                 predictions.append(pred)
         
         confidence = 60  # Lower confidence for trend-based
-        print(f"   Trend predictions: {predictions}")
+        MODEL_LOG.debug(f"   Trend predictions: {predictions}")
         
         return np.array(predictions), confidence
         
     except Exception as e:
-        print(f"❌ Error generating trend predictions: {e}")
+        MODEL_LOG.error(f"❌ Error generating trend predictions: {e}")
         return np.array([100] * horizon), 30  # Fallback values
 
 # ------------------ GENERATE PREDICTIONS ------------------
@@ -256,31 +386,35 @@ def generate_predictions(data_buffer, model_path=None):
     try:
         # Check if we have enough data
         if len(data_buffer) < MIN_DATA_FOR_PREDICTION:
-            print(f"⚠️ Need at least {MIN_DATA_FOR_PREDICTION} data points for predictions. Have {len(data_buffer)}")
-            return None, None, "insufficient_data", 0
-        
-        # Try LSTM predictions first
-        if model_path and os.path.exists(model_path):
-            model = load_model_safely(model_path)
-            if model is not None:
-                # Use the actual sequence length determined from the model
-                if len(data_buffer) >= ACTUAL_SEQ_LENGTH:
-                    X_input, scaler = prepare_sequence_data(data_buffer, ACTUAL_SEQ_LENGTH)
-                    if X_input is not None and scaler is not None:
-                        predictions, confidence = generate_lstm_predictions(model, X_input, scaler, PREDICTION_HORIZON)
-                        if predictions is not None:
-                            return predictions, confidence, "LSTM", ACTUAL_SEQ_LENGTH
-                
-                print(f"⚠️ Not enough data for LSTM model. Need {ACTUAL_SEQ_LENGTH}, have {len(data_buffer)}")
+            MODEL_LOG.info(f"⚠️ Need at least {MIN_DATA_FOR_PREDICTION} data points for predictions. Have {len(data_buffer)}")
+            return None, None, "insufficient_data", 0, None
+        
+        # Try LSTM predictions first - through the shared daemon when one is running
+        model, version = None, None
+        client = get_inference_client()
+        if client is not None:
+            model, version = client, client.version
+        elif model_path and os.path.exists(model_path):
+            model, version = get_model(model_path)
+        if model is not None:
+            # Use the actual sequence length determined from the model
+            if len(data_buffer) >= ACTUAL_SEQ_LENGTH:
+                X_input, scaler = prepare_sequence_data(data_buffer, ACTUAL_SEQ_LENGTH)
+                if X_input is not None and scaler is not None:
+                    predictions, confidence, quantiles = generate_lstm_predictions(model, X_input, scaler, PREDICTION_HORIZON, version)
+                    if predictions is not None:
+                        return predictions, confidence, "LSTM", ACTUAL_SEQ_LENGTH, quantiles
+            
+            MODEL_LOG.info(f"⚠️ Not enough data for LSTM model. Need {ACTUAL_SEQ_LENGTH}, have {len(data_buffer)}")
         
         # Fallback to trend-based predictions
         predictions, confidence = generate_trend_predictions(data_buffer, PREDICTION_HORIZON)
-        return predictions, confidence, "Trend-based", len(data_buffer)
+        return predictions, confidence, "Trend-based", len(data_buffer), None
         
     except Exception as e:
-        print(f"❌ Error in generate_predictions: {e}")
+        MODEL_LOG.error(f"❌ Error in generate_predictions: {e}")
         # Emergency fallback
-        return np.array([100] * PREDICTION_HORIZON), 20, "Fallback", 0
+        return np.array([100] * PREDICTION_HORIZON), 20, "Fallback", 0, None
 
 # ------------------ LOG TO TERMINAL FILE ------------------
 def log_terminal_entry(entry_type, data):
@@ -300,39 +434,22 @@ def log_terminal_entry(entry_type, data):
         # Keep only last 100 entries
         terminal_log = terminal_log[-100:]
         
-        with open(TERMINAL_LOG_PATH, 'w') as f:
-            json.dump(terminal_log, f, indent=2)
+        write_json_atomic(TERMINAL_LOG_PATH, terminal_log)
             
     except Exception as e:
-        print(f"Error logging to terminal file: {e}")
+        SYSTEM_LOG.error(f"Error logging to terminal file: {e}")
 
-# ------------------ MAIN SIMULATION ------------------
-def run_realtime_simulation():
-    print("🚀 Starting HTWK Solar Monitoring System...")
-    print("📊 Real-time data processing with AI predictions")
-    print("🔋 Using REAL data from Excel file")
-    print("=" * 60)
-    
-    # Initialize status
-    update_status("starting", "Initializing solar monitoring simulation")
-    
-    # Find model file
-    model_path = find_model_file()
-    
-    # Check Excel file
-    if not os.path.exists(INPUT_EXCEL):
-        print(f"❌ ERROR: Excel file '{INPUT_EXCEL}' not found!")
-        print("📁 Please ensure your Excel file is in the python/ directory")
-        print("📝 Expected filename: InverterSA1ES111K4H349-Detailed Data-20250630.xlsx")
-        print("💡 Or update the INPUT_EXCEL variable in the script")
-        update_status("error", f"Excel file not found: {INPUT_EXCEL}")
-        return
-    
+# ------------------ LOAD EXCEL DATA ------------------
+def load_excel_data(excel_path):
+    """Read and clean the inverter export; returns None (and sets error status) on failure"""
     try:
         # Load Excel data
-        print(f"✅ Loading Excel file: {INPUT_EXCEL}")
-        df_raw = pd.read_excel(INPUT_EXCEL, engine='openpyxl')
-        print(f"📈 Loaded {len(df_raw)} rows of data")
+        SYSTEM_LOG.info(f"✅ Loading Excel file: {excel_path}")
+        if excel_path.lower().endswith('.csv'):
+            df_raw = pd.read_csv(excel_path)  # Same columns, re-exported as CSV
+        else:
+            df_raw = pd.read_excel(excel_path, engine='openpyxl')
+        SYSTEM_LOG.info(f"📈 Loaded {len(df_raw)} rows of data")
         
         # Check if required columns exist
         required_columns = [
@@ -348,12 +465,12 @@ def run_realtime_simulation():
         
         missing_columns = [col for col in required_columns if col not in df_raw.columns]
         if missing_columns:
-            print(f"❌ Missing columns in Excel file: {missing_columns}")
-            print("📋 Available columns:")
+            SYSTEM_LOG.error(f"❌ Missing columns in Excel file: {missing_columns}")
+            SYSTEM_LOG.error("📋 Available columns:")
             for col in df_raw.columns:
-                print(f"   - {col}")
+                SYSTEM_LOG.error(f"   - {col}")
             update_status("error", f"Missing columns: {missing_columns}")
-            return
+            return None
         
         # Process columns
         df_raw = df_raw[required_columns]
@@ -365,122 +482,390 @@ def run_realtime_simulation():
         # Clean and sort data
         df_raw['timestamp'] = pd.to_datetime(df_raw['timestamp'])
         df_raw = df_raw.sort_values('timestamp').dropna()
-        print(f"📊 Processing {len(df_raw)} valid data rows")
+        SYSTEM_LOG.info(f"📊 Processing {len(df_raw)} valid data rows")
+        return df_raw
         
     except Exception as e:
-        print(f"❌ ERROR reading Excel file: {e}")
+        SYSTEM_LOG.error(f"❌ ERROR reading Excel file: {e}")
         update_status("error", f"Error reading Excel file: {e}")
+        return None
+
+# ------------------ CHECKPOINTS ------------------
+def request_stop(signum, frame):
+    """Signal handler: finish the current row, checkpoint, then exit"""
+    global STOP_REQUESTED
+    STOP_REQUESTED = True
+
+def write_checkpoint(last_timestamp, rows_processed, data_buffer, total_predictions,
+                     successful_predictions, scheduler, health):
+    """Persist everything needed to resume after the last fully processed row"""
+    try:
+        # Retention runs here (before the snapshot) so restores never reference pruned partitions
+        REAL_DATA_STORE.prune(REAL_DATA_RETENTION_DAYS, last_timestamp)
+        FORECAST_STORE.prune(PREDICTION_RETENTION_DAYS, last_timestamp)
+        DAY_AHEAD_STORE.prune(PREDICTION_RETENTION_DAYS, last_timestamp)
+        REAL_DATA_STORE.flush()
+        FORECAST_STORE.flush()
+        
+        save_checkpoint(CHECKPOINT_PATH, {
+            "source": os.path.abspath(INPUT_EXCEL),
+            "high_water_mark": last_timestamp.isoformat(),
+            "rows_processed": rows_processed,
+            "total_predictions": total_predictions,
+            "successful_predictions": successful_predictions,
+            "buffer": serialize_rows(data_buffer[-max(SEQ_LENGTH, ACTUAL_SEQ_LENGTH):]),
+            "scheduler": scheduler.state_dict(),
+            "health": health.state_dict(),
+            # Forecast cells are overwritten on replay, so only the append-only store needs a snapshot
+            "sinks": {
+                "real_data": REAL_DATA_STORE.snapshot(DEFAULT_INVERTER)
+            }
+        })
+    except Exception as e:
+        SYSTEM_LOG.warning(f"⚠️ Error writing checkpoint: {e}")
+
+# ------------------ PROCESS ONE SAMPLE ------------------
+def process_row(row, row_number, data_buffer, scheduler, health, model_path, inverter_id=DEFAULT_INVERTER):
+    """Sink, log, health-check and forecast one sample; returns (predicted, successful)"""
+    # Add to buffer
+    row_dict = row.to_dict()
+    data_buffer.append(row_dict)
+    del data_buffer[:-MAX_BUFFER_ROWS]
+    
+    # Save real-time data
+    REAL_DATA_STORE.append([{'timestamp': row['timestamp'], 'real_power': row['real_power']}], inverter_id)
+    
+    # Display current data
+    display_time = row['timestamp'].strftime('%Y-%m-%d %H:%M:%S')
+    
+    # Log data entry
+    sample = {
+        "rowNumber": row_number,
+        "timestamp": display_time,
+        "real_power": float(row['real_power']),
+        "daily_prod": float(row['daily_prod']),
+        "ac_current": float(row['ac_current']),
+        "ac_voltage": float(row['ac_voltage']),
+        "temp_inverter": float(row['temp_inverter']),
+        "cumulative_prod": float(row['cumulative_prod']),
+        "ac_freq": float(row['ac_freq'])
+    }
+    if inverter_id != DEFAULT_INVERTER:
+        sample["inverter_id"] = inverter_id
+    # One record per row; the message is only formatted if the record passes sampling
+    DATA_LOG.info(DATA_ROW_FORMAT, row_number, display_time, row['real_power'], row['daily_prod'],
+                  row['ac_current'], row['ac_voltage'], row['temp_inverter'], row['cumulative_prod'],
+                  row['ac_freq'], extra={"fields": sample})
+    log_terminal_entry("data", sample)
+    record_latest_sample(sample)
+    
+    # Streaming health checks on temperature, voltage, current and frequency
+    for alert in health.update(display_time, sample):
+        ALERT_LOG.warning("   🚨 %s %s: %s", alert['channel'], alert['kind'], alert['value'], extra={"fields": alert})
+        log_terminal_entry("alert", alert)
+    
+    # Generate predictions - night/idle rows get a cheap zero forecast instead of the model
+    future_times = [row['timestamp'] + timedelta(minutes=15 * (i + 1)) for i in range(PREDICTION_HORIZON)]
+    scheduler.observe(row['timestamp'], row['real_power'])
+    if scheduler.should_skip_inference(future_times):
+        predictions, confidence, method, seq_used = np.zeros(PREDICTION_HORIZON), 100, "Idle", 0
+        quantiles = np.zeros((len(QUANTILES), PREDICTION_HORIZON))
+    else:
+        predictions, confidence, method, seq_used, quantiles = generate_predictions(data_buffer, model_path)
+    
+    if predictions is None:
+        SYSTEM_LOG.warning(f"   ⚠️ No predictions generated for row {row_number}")
+        return False, False
+    
+    predictions_data = []
+    for i, pred in enumerate(predictions):
+        future_time = future_times[i]
+        display_future_time = future_time.strftime('%Y-%m-%d %H:%M:%S')
+        
+        predictions_data.append({
+            "predictionNumber": i + 1,
+            "timestamp": display_future_time,
+            "predicted_power": float(pred),
+            "method": method,
+            "confidence": confidence
+        })
+        
+        # Forecast interval (only model-based forecasts have one)
+        if quantiles is not None:
+            for q, values in zip(QUANTILES, quantiles):
+                predictions_data[-1][f"p{q}"] = float(values[i])
+    
+    # Save predictions - one slot-indexed write per forecast set, issued at the sample time
+    FORECAST_STORE.write(row['timestamp'], future_times, predictions, method, confidence, quantiles, inverter_id)
+    
+    # Log predictions - idle zero forecasts only update the snapshot
+    PREDICTION_LOG.info("\n🔮 Generating %d predictions using %s (confidence: %.1f%%)\n   📊 Sequence length used: %s\n%s",
+                        len(predictions), method, confidence, seq_used,
+                        LazyText(lambda data=predictions_data: "\n".join(
+                            f"   📈 Prediction {p['predictionNumber']} ➜ {p['timestamp']}: {p['predicted_power']:.2f} W"
+                            for p in data)),
+                        extra={"fields": {"method": method, "confidence": confidence,
+                                          "sequence_length": seq_used, "predictions": predictions_data}})
+    record_latest_predictions(predictions_data)
+    if method != "Idle":
+        log_terminal_entry("prediction", {
+            "predictions": predictions_data,
+            "method": method,
+            "confidence": confidence,
+            "sequence_length": seq_used
+        })
+    
+    # Idle zero forecasts are not model predictions and stay out of the accuracy counters
+    if method == "Idle":
+        return False, False
+    
+    # Consider predictions with >50% confidence as successful
+    return True, confidence > 50
+
+# ------------------ MAIN SIMULATION ------------------
+def run_realtime_simulation():
+    SYSTEM_LOG.info("🚀 Starting HTWK Solar Monitoring System...")
+    SYSTEM_LOG.info("📊 Real-time data processing with AI predictions")
+    SYSTEM_LOG.info("🔋 Using REAL data from Excel file")
+    SYSTEM_LOG.info("=" * 60)
+    
+    # Initialize status
+    update_status("starting", "Initializing solar monitoring simulation")
+    
+    # Find model file
+    model_path = find_model_file()
+    
+    # Check Excel file
+    if not os.path.exists(INPUT_EXCEL):
+        SYSTEM_LOG.error(f"❌ ERROR: Excel file '{INPUT_EXCEL}' not found!")
+        SYSTEM_LOG.error("📁 Please ensure your Excel file is in the python/ directory")
+        SYSTEM_LOG.error("📝 Expected filename: InverterSA1ES111K4H349-Detailed Data-20250630.xlsx")
+        SYSTEM_LOG.error("💡 Or update the INPUT_EXCEL variable in the script")
+        update_status("error", f"Excel file not found: {INPUT_EXCEL}")
+        return
+    
+    # Parsed data is cached next to the Excel file, so restarts don't re-parse it
+    df_raw = load_frame_cached(INPUT_EXCEL, load_excel_data)
+    if df_raw is None:
         return
     
     # Initialize tracking variables
     data_buffer = []
     total_predictions = 0
     successful_predictions = 0
+    rows_processed = 0
+    total_rows = len(df_raw)
+    scheduler = IdleScheduler()
+    health = HealthMonitor()
+    
+    # Resume from the latest checkpoint: restore state, drop sink rows written after it,
+    # and skip straight past the high-water mark
+    checkpoint = load_checkpoint(CHECKPOINT_PATH)
+    if checkpoint and checkpoint.get("source") == os.path.abspath(INPUT_EXCEL):
+        REAL_DATA_STORE.restore(checkpoint["sinks"]["real_data"], DEFAULT_INVERTER)
+        data_buffer = deserialize_rows(checkpoint["buffer"])
+        total_predictions = checkpoint["total_predictions"]
+        successful_predictions = checkpoint["successful_predictions"]
+        rows_processed = checkpoint["rows_processed"]
+        scheduler.load_state_dict(checkpoint["scheduler"])
+        health.load_state_dict(checkpoint["health"])
+        
+        high_water_mark = pd.Timestamp(checkpoint["high_water_mark"])
+        df_raw = df_raw[df_raw['timestamp'] > high_water_mark]
+        SYSTEM_LOG.info(f"⏩ Resuming after {high_water_mark} ({rows_processed} rows already processed)")
+    else:
+        # No usable checkpoint (first run, --fresh, crash before the first one, or history imported
+        # by init_files): rows already in the store are never appended again
+        stored_until = REAL_DATA_STORE.latest_timestamp()
+        if stored_until is not None:
+            df_raw = df_raw[df_raw['timestamp'] > stored_until]
+            data_buffer = REAL_DATA_STORE.read_tail(ACTUAL_SEQ_LENGTH).to_dict('records')
+            SYSTEM_LOG.info(f"⏩ Skipping rows up to {stored_until} already in {REAL_DATA_DIR}")
+    
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
     
     update_status("active", "Solar monitoring simulation is running")
     
-    print("🚀 Starting real-time simulation...")
-    print(f"🎯 Using sequence length: {ACTUAL_SEQ_LENGTH}")
-    print("=" * 60)
+    SYSTEM_LOG.info("🚀 Starting real-time simulation...")
+    SYSTEM_LOG.info(f"🎯 Using sequence length: {ACTUAL_SEQ_LENGTH}")
+    SYSTEM_LOG.info("=" * 60)
     
     # Process each row
     for idx, row in df_raw.iterrows():
-        # Add to buffer
-        row_dict = row.to_dict()
-        data_buffer.append(row_dict)
-        
-        # Save real-time data
-        pd.DataFrame([row[['timestamp', 'real_power']]]).to_csv(
-            REAL_DATA_PATH, mode='a', header=False, index=False
-        )
-        
-        # Display current data
-        display_time = row['timestamp'].strftime('%Y-%m-%d %H:%M:%S')
-        print(f"\n🟢 Row {idx + 1} ➜ Time: {display_time}")
-        print(f"   🔸 Power(W): {row['real_power']:.1f}")
-        print(f"   🔸 Daily Prod(kWh): {row['daily_prod']:.2f}")
-        print(f"   🔸 AC Current(A): {row['ac_current']:.1f}")
-        print(f"   🔸 AC Voltage(V): {row['ac_voltage']:.1f}")
-        print(f"   🔸 Inverter Temp(℃): {row['temp_inverter']:.1f}")
-        print(f"   🔸 Cumulative Prod(kWh): {row['cumulative_prod']:.1f}")
-        print(f"   🔸 AC Frequency(Hz): {row['ac_freq']:.2f}")
-        
-        # Log data entry
-        log_terminal_entry("data", {
-            "rowNumber": idx + 1,
-            "timestamp": display_time,
-            "real_power": float(row['real_power']),
-            "daily_prod": float(row['daily_prod']),
-            "ac_current": float(row['ac_current']),
-            "ac_voltage": float(row['ac_voltage']),
-            "temp_inverter": float(row['temp_inverter']),
-            "cumulative_prod": float(row['cumulative_prod']),
-            "ac_freq": float(row['ac_freq'])
-        })
-        
-        # Generate predictions
-        predictions, confidence, method, seq_used = generate_predictions(data_buffer, model_path)
-        
-        if predictions is not None:
-            total_predictions += 1
-            if confidence > 50:  # Consider predictions with >50% confidence as successful
-                successful_predictions += 1
-            
-            print(f"\n🔮 Generating {len(predictions)} predictions using {method} (confidence: {confidence:.1f}%)")
-            print(f"   📊 Sequence length used: {seq_used}")
-            
-            predictions_data = []
-            for i, pred in enumerate(predictions):
-                future_time = row['timestamp'] + timedelta(minutes=15 * (i + 1))
-                display_future_time = future_time.strftime('%Y-%m-%d %H:%M:%S')
-                
-                print(f"   📈 Prediction {i + 1} ➜ {display_future_time}: {pred:.2f} W")
-                
-                # Save prediction
-                pd.DataFrame([{
-                    'timestamp': future_time,
-                    'predicted_power': pred,
-                    'method': method,
-                    'confidence': confidence
-                }]).to_csv(PREDICTION_PATH, mode='a', header=False, index=False)
-                
-                predictions_data.append({
-                    "predictionNumber": i + 1,
-                    "timestamp": display_future_time,
-                    "predicted_power": float(pred),
-                    "method": method,
-                    "confidence": confidence
-                })
-            
-            # Log predictions
-            log_terminal_entry("prediction", {
-                "predictions": predictions_data,
-                "method": method,
-                "confidence": confidence,
-                "sequence_length": seq_used
-            })
-        else:
-            print(f"   ⚠️ No predictions generated for row {idx + 1}")
+        predicted, successful = process_row(row, idx + 1, data_buffer, scheduler, health, model_path)
+        total_predictions += predicted
+        successful_predictions += successful
         
         # Update status with accuracy
+        rows_processed += 1
         accuracy = (successful_predictions / total_predictions * 100) if total_predictions > 0 else 0
-        update_status("active", f"Processing row {idx + 1}/{len(df_raw)}", accuracy, total_predictions)
+        update_status("active", f"Processing row {idx + 1}/{total_rows}", accuracy, total_predictions,
+                      **scheduler.stats(), forecast_cache=FORECAST_CACHE.stats(), health=health.stats())
+        
+        # Periodic checkpoint (and always before honouring a stop request)
+        if STOP_REQUESTED or rows_processed % CHECKPOINT_EVERY_ROWS == 0:
+            write_checkpoint(row['timestamp'], rows_processed, data_buffer, total_predictions,
+                             successful_predictions, scheduler, health)
+        if STOP_REQUESTED:
+            update_status("stopped", f"Simulation stopped at row {idx + 1}/{total_rows}", accuracy, total_predictions)
+            SYSTEM_LOG.info(f"\n⏹️ Stop requested - checkpoint saved after row {idx + 1}")
+            return
         
         # Simulate real-time delay
         time.sleep(1)  # 1 second delay for faster processing
     
     # Final status update
+    if len(df_raw) > 0:
+        write_checkpoint(df_raw['timestamp'].iloc[-1], rows_processed, data_buffer, total_predictions,
+                         successful_predictions, scheduler, health)
     final_accuracy = (successful_predictions / total_predictions * 100) if total_predictions > 0 else 0
-    update_status("completed", f"Simulation completed. Processed {len(df_raw)} rows.", final_accuracy, total_predictions)
+    update_status("completed", f"Simulation completed. Processed {rows_processed} rows.", final_accuracy, total_predictions)
     
-    print(f"\n✅ Simulation completed!")
-    print(f"📊 Processed {len(df_raw)} data points")
-    print(f"🔮 Generated {total_predictions} prediction sets")
-    print(f"🎯 Model accuracy: {final_accuracy:.1f}%")
-    print(f"💾 Data saved to: {REAL_DATA_PATH}")
-    print(f"📈 Predictions saved to: {PREDICTION_PATH}")
+    SYSTEM_LOG.info(f"\n✅ Simulation completed!")
+    SYSTEM_LOG.info(f"📊 Processed {rows_processed} data points")
+    SYSTEM_LOG.info(f"🔮 Generated {total_predictions} prediction sets")
+    SYSTEM_LOG.info(f"🎯 Model accuracy: {final_accuracy:.1f}%")
+    SYSTEM_LOG.info(f"💾 Data saved to: {REAL_DATA_DIR}")
+    SYSTEM_LOG.info(f"📈 Predictions saved to: {FORECAST_DIR}")
+
+# ------------------ WATCH-FOLDER INGESTION ------------------
+def open_inverter_pipeline(inverter_id):
+    """Per-inverter buffer/scheduler/health, with the buffer seeded from the stored history"""
+    history = REAL_DATA_STORE.read_tail(ACTUAL_SEQ_LENGTH, inverter_id)
+    return {
+        "buffer": history.to_dict('records'),
+        "scheduler": IdleScheduler(),
+        "health": HealthMonitor(inverter_id)
+    }
+
+def run_watch_ingestion(watch_dir=WATCH_DIR, poll_seconds=POLL_SECONDS):
+    """Feed new rows from daily exports dropped into watch_dir through the live pipeline"""
+    SYSTEM_LOG.info(f"👀 Watching {watch_dir} for inverter exports (polling every {poll_seconds}s)")
+    update_status("starting", f"Watching {watch_dir} for new exports")
+    
+    model_path = find_model_file()
+    os.makedirs(watch_dir, exist_ok=True)
+    watcher = WatchFolder(watch_dir)
+    pipelines = {}
+    total_predictions = 0
+    successful_predictions = 0
+    rows_processed = 0
+    
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+    update_status("active", f"Watching {watch_dir} for new exports")
+    
+    while not STOP_REQUESTED:
+        for path, inverter_id, new_rows in watcher.poll(load_excel_data):
+            # Rows already in the store (e.g. written just before a crash) are never replayed
+            stored_until = REAL_DATA_STORE.latest_timestamp(inverter_id)
+            if stored_until is not None:
+                new_rows = new_rows[new_rows['timestamp'] > stored_until]
+            SYSTEM_LOG.info(f"📥 {os.path.basename(path)}: {len(new_rows)} new rows for {inverter_id}")
+            
+            if inverter_id not in pipelines:
+                pipelines[inverter_id] = open_inverter_pipeline(inverter_id)
+            pipeline = pipelines[inverter_id]
+            
+            for _, row in new_rows.iterrows():
+                rows_processed += 1
+                predicted, successful = process_row(row, rows_processed, pipeline["buffer"], pipeline["scheduler"],
+                                                    pipeline["health"], model_path, inverter_id)
+                total_predictions += predicted
+                successful_predictions += successful
+                if STOP_REQUESTED:
+                    break
+            
+            if len(new_rows):
+                REAL_DATA_STORE.prune(REAL_DATA_RETENTION_DAYS, new_rows['timestamp'].max())
+                FORECAST_STORE.prune(PREDICTION_RETENTION_DAYS, new_rows['timestamp'].max())
+                DAY_AHEAD_STORE.prune(PREDICTION_RETENTION_DAYS, new_rows['timestamp'].max())
+            REAL_DATA_STORE.flush()
+            FORECAST_STORE.flush()
+            if STOP_REQUESTED:
+                break  # Partly processed file: picked up again (past the stored rows) on restart
+            watcher.mark_ingested(path, inverter_id, new_rows)
+            
+            accuracy = (successful_predictions / total_predictions * 100) if total_predictions > 0 else 0
+            update_status("active", f"Ingested {os.path.basename(path)} ({len(new_rows)} new rows)", accuracy,
+                          total_predictions, forecast_cache=FORECAST_CACHE.stats(),
+                          high_water_marks=watcher.state["high_water_marks"])
+        
+        for _ in range(poll_seconds):
+            if STOP_REQUESTED:
+                break
+            time.sleep(1)
+    
+    accuracy = (successful_predictions / total_predictions * 100) if total_predictions > 0 else 0
+    update_status("stopped", f"Watcher stopped after {rows_processed} new rows", accuracy, total_predictions)
+    SYSTEM_LOG.info(f"\n⏹️ Watcher stopped - {rows_processed} new rows ingested")
+
+# ------------------ DAY-AHEAD FORECAST ------------------
+def run_day_ahead_forecast(steps=DAY_AHEAD_STEPS):
+    """Forecast up to `steps` x 15min ahead from the latest real data in one batched rollout"""
+    SYSTEM_LOG.info(f"🌅 Day-ahead forecast: {steps} steps ({steps * STEP_MINUTES / 60:.0f}h)")
+    if steps > DAY_AHEAD_STORE.max_horizon:
+        SYSTEM_LOG.warning(f"⚠️ Only the first {DAY_AHEAD_STORE.max_horizon} steps fit the day-ahead store and are saved")
+    
+    model_path = find_model_file()
+    if model_path is None:
+        SYSTEM_LOG.error("❌ Day-ahead forecasting requires an LSTM model")
+        return
+    model, _ = get_model(model_path)
+    if model is None:
+        return
+    
+    # Each inverter contributes its latest window; all windows are rolled out as one batch
+    windows, last_timestamps = {}, {}
+    for inverter_id in REAL_DATA_STORE.manifest["partitions"]:
+        df = REAL_DATA_STORE.read_tail(ACTUAL_SEQ_LENGTH, inverter_id)
+        if len(df) < ACTUAL_SEQ_LENGTH:
+            SYSTEM_LOG.warning(f"⚠️ Not enough data for {inverter_id}. Need {ACTUAL_SEQ_LENGTH}, have {len(df)}")
+            continue
+        windows[inverter_id] = df['real_power'].values
+        last_timestamps[inverter_id] = df['timestamp'].iloc[-1]
+    if not windows:
+        return
+    
+    start = time.time()
+    forecasts = forecast_multi_horizon(model, windows, steps)
+    SYSTEM_LOG.info(f"⏱️ Rolled out {len(forecasts)} inverter(s) x {steps} steps in {time.time() - start:.2f}s")
+    
+    for inverter_id, forecast in forecasts.items():
+        future_times = pd.date_range(last_timestamps[inverter_id] + timedelta(minutes=STEP_MINUTES),
+                                     periods=steps, freq=f"{STEP_MINUTES}min")
+        # A recursive rollout has no per-step confidence estimate
+        DAY_AHEAD_STORE.write(last_timestamps[inverter_id], future_times, forecast, "LSTM-DayAhead",
+                              inverter=inverter_id)
+    DAY_AHEAD_STORE.prune(PREDICTION_RETENTION_DAYS, max(last_timestamps.values()))
+    
+    SYSTEM_LOG.info(f"📈 Day-ahead predictions saved to: {DAY_AHEAD_FORECAST_DIR}")
 
 # ------------------ RUN EVERYTHING ------------------
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTWK Solar Monitoring System")
+    parser.add_argument("--day-ahead", action="store_true",
+                        help="Write a multi-horizon forecast from the latest data and exit")
+    parser.add_argument("--steps", type=int, default=DAY_AHEAD_STEPS,
+                        help="Number of 15min steps for --day-ahead (default: 192 = 48h)")
+    parser.add_argument("--fresh", action="store_true",
+                        help="Delete the simulation checkpoint and the simulated inverter's real data, and replay from the first row")
+    parser.add_argument("--watch", nargs="?", const=WATCH_DIR, metavar="DIR",
+                        help=f"Ingest new daily exports dropped into DIR (default: {WATCH_DIR}) instead of replaying INPUT_EXCEL")
+    parser.add_argument("--poll-seconds", type=int, default=POLL_SECONDS,
+                        help="Watch-folder polling interval")
+    args = parser.parse_args()
+    
+    setup_logging()
     init_files()
-    run_realtime_simulation()
+    if args.fresh:
+        clear_checkpoint(CHECKPOINT_PATH)
+        # Otherwise the no-checkpoint start would skip every row already in the store
+        REAL_DATA_STORE.restore({}, DEFAULT_INVERTER)
+    if args.day_ahead:
+        run_day_ahead_forecast(args.steps)
+    elif args.watch:
+        run_watch_ingestion(args.watch, args.poll_seconds)
+    else:
+        run_realtime_simulation()
@@ -0,0 +1,383 @@
+"""
+Synthetic multi-inverter, multi-year data in the inverter export schema.
+
+Learns the clear-sky power envelope (as a function of solar elevation), the
+day-to-day clearness distribution, the intra-day cloud autocorrelation, the
+inverter rating and the reporting resolution from full_training_data.csv, then
+generates vectorized streams for a fleet of inverters with clouds, clipping,
+reporting gaps and sensor faults (stuck values, spikes, dropouts).
+
+History mode writes one file per inverter per day or month, named like the portal
+exports, e.g. "InverterSYN00001-Detailed Data-20250630.csv". Live mode releases rows
+in (accelerated) real time into a watch folder for `solar_monitoring_with_model.py --watch`.
+
+Usage:
+    python synthetic_data.py --inverters 50 --years 2
+    python synthetic_data.py --inverters 200 --live --speedup 900 --output ../data/incoming
+"""
+# ------------------ IMPORTS ------------------
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from atomic_io import write_bytes_atomic
+from idle_scheduler import solar_elevation_array
+from watch_ingest import POLL_SECONDS
+
+# ------------------ CONFIGURATION ------------------
+SOURCE_PATH = "../full_training_data.csv"  # ~1 month, one inverter
+OUTPUT_DIR = "../data/synthetic"
+INTERVAL_MINUTES = 15
+# Live files are rewritten at most this often (wall time). The watcher only reads a file whose
+# size/mtime held across two consecutive polls, so this must exceed twice its poll interval.
+RELEASE_SECONDS = 2 * POLL_SECONDS + 5
+EXPORT_COLUMNS = [
+    'Updated Time',
+    'Total AC Output Power (Active)(W)',
+    'Daily Production (Active)(kWh)',
+    'AC Current R/U/A(A)',
+    'AC Voltage R/U/A(V)',
+    'Temperature- Inverter(℃)',
+    'Cumulative Production (Active)(kWh)',
+    'AC Output Frequency R(Hz)'
+]
+
+# Profile learning
+ENVELOPE_BINS = 20  # Bins over sin(solar elevation)
+ENVELOPE_PERCENTILE = 95  # Clear-sky power per bin
+MIN_CLEARNESS_SIN_ELEVATION = 0.2  # Clearness ratios near sunrise/sunset are too noisy to use
+
+# Fleet variation
+SIZE_FACTOR_RANGE = (0.5, 2.0)  # Inverter size relative to the learned one
+DC_RATIO_RANGE = (1.0, 1.3)  # Array oversizing; >1 clips at rated AC power on clear days
+LOCAL_CLOUD_SHARE = 0.4  # Share of intra-day cloud variance that is local to each inverter
+WINTER_CLEARNESS_DROP = 0.15  # Source data is summer-only; winter days are cloudier
+
+# Fault injection (per inverter sample unless stated otherwise)
+GAP_RATE = 0.002  # Reporting outages start
+GAP_MEAN_LENGTH = 12  # Samples
+STUCK_RATE = 0.0005  # Sensor repeats its last value
+STUCK_MEAN_LENGTH = 8
+DROPOUT_RATE = 0.0005  # Sensor reads zero
+DROPOUT_MEAN_LENGTH = 3
+SPIKE_RATE = 0.0005  # Single-sample outliers
+SPIKE_FACTOR_RANGE = (1.5, 3.0)
+
+# Auxiliary channels (Sfax climate, 230 V / 50 Hz grid)
+AMBIENT_MEAN_C = 20.0
+AMBIENT_SEASONAL_C = 8.0
+AMBIENT_DIURNAL_C = 5.0
+INVERTER_TEMP_RISE_C = 20.0  # At rated power
+NOMINAL_VOLTAGE = 230.0
+NOMINAL_FREQUENCY = 50.0
+
+
+# ------------------ PROFILE LEARNING ------------------
+def learn_profile(path=SOURCE_PATH):
+    """Fit the generator's parameters from a timestamp,real_power history (JSON-serializable dict)"""
+    df = pd.read_csv(path, parse_dates=['timestamp']).dropna().sort_values('timestamp')
+    timestamps = df['timestamp'].values
+    power = df['real_power'].to_numpy(dtype=np.float64)
+    elevation = solar_elevation_array(timestamps)
+    sin_elevation = np.clip(np.sin(np.radians(elevation)), 0, 1)
+
+    # Clear-sky envelope: upper percentile of power per elevation bin, forced non-decreasing
+    edges = np.linspace(0, 1, ENVELOPE_BINS + 1)
+    centers = (edges[:-1] + edges[1:]) / 2
+    bin_index = np.clip(np.digitize(sin_elevation, edges) - 1, 0, ENVELOPE_BINS - 1)
+    envelope = np.full(ENVELOPE_BINS, np.nan)
+    for b in range(ENVELOPE_BINS):
+        in_bin = power[bin_index == b]
+        if len(in_bin) >= 5:
+            envelope[b] = np.percentile(in_bin, ENVELOPE_PERCENTILE)
+    known = ~np.isnan(envelope)
+    centers = np.concatenate([[0], centers])  # No power with the sun on the horizon
+    envelope = np.interp(centers, np.concatenate([[0], centers[1:][known]]), np.concatenate([[0], envelope[known]]))
+    envelope = np.maximum.accumulate(envelope)
+
+    # Clearness index and its day-level / intra-day structure
+    usable = sin_elevation >= MIN_CLEARNESS_SIN_ELEVATION
+    clear_sky = np.interp(sin_elevation, centers, envelope)
+    clearness = np.clip(power[usable] / np.maximum(clear_sky[usable], 1.0), 0, 1.3)
+    days = df['timestamp'].dt.date.values[usable]
+    daily = pd.Series(clearness).groupby(days).mean()
+    residual = clearness - daily.reindex(days).to_numpy()
+
+    same_day = days[1:] == days[:-1]
+    lag1 = np.corrcoef(residual[1:][same_day], residual[:-1][same_day])[0, 1] if same_day.sum() > 2 else 0.0
+    sample_minutes = float(np.median(np.diff(timestamps).astype("timedelta64[s]").astype(float)) / 60)
+
+    # Reporting resolution (the export rounds power), and the solar elevations at which the
+    # inverter starts (first row of a day) and stops (last row) reporting
+    steps = np.diff(np.unique(power))
+    resolution = float(pd.Series(steps[steps > 0]).mode().iloc[0]) if len(steps) else 1.0
+    by_day = pd.Series(elevation).groupby(df['timestamp'].dt.date.values)
+
+    return {
+        "source": path,
+        "samples": int(len(df)),
+        "envelope_sin_elevation": centers.round(4).tolist(),
+        "envelope_power_w": envelope.round(2).tolist(),
+        "rated_power_w": float(power.max()),
+        "power_resolution_w": resolution,
+        "daily_clearness": daily.clip(0, 1.3).round(4).tolist(),
+        "cloud_lag1": float(np.clip(np.nan_to_num(lag1), 0, 0.999)),
+        "cloud_sigma": float(np.nanstd(residual)),
+        "sample_minutes": sample_minutes,
+        "wake_elevation_deg": float(by_day.first().median()),
+        "sleep_elevation_deg": float(by_day.last().median())
+    }
+
+
+# ------------------ FAULT MASKS ------------------
+def run_mask(rng, shape, rate, mean_length):
+    """Boolean mask of runs: starts ~ Bernoulli(rate), lengths ~ Geometric(1/mean_length)"""
+    n_rows, n_cols = shape
+    edges = np.zeros((n_rows, n_cols + 1), dtype=np.int32)
+    rows, starts = np.nonzero(rng.random(shape) < rate)
+    ends = np.minimum(starts + rng.geometric(1 / mean_length, len(starts)), n_cols)
+    np.add.at(edges, (rows, starts), 1)
+    np.add.at(edges, (rows, ends), -1)
+    return np.cumsum(edges[:, :-1], axis=1) > 0
+
+
+def hold_last(values, mask):
+    """Replace masked samples by the last unmasked value in the same row (stuck sensor)"""
+    index = np.where(mask, 0, np.arange(values.shape[1]))
+    index = np.maximum.accumulate(index, axis=1)
+    return np.take_along_axis(values, index, axis=1)
+
+
+# ------------------ FLEET GENERATOR ------------------
+class FleetGenerator:
+    """Stateful vectorized generator: successive generate() calls continue the same streams"""
+
+    def __init__(self, profile, n_inverters, interval_minutes=INTERVAL_MINUTES, seed=0, faults=True):
+        self.profile = profile
+        self.n_inverters = n_inverters
+        self.interval_minutes = interval_minutes
+        self.faults = faults
+        self.rng = np.random.default_rng(seed)
+
+        self.serials = [f"SYN{i + 1:05d}" for i in range(n_inverters)]
+        self.size_factor = self.rng.uniform(*SIZE_FACTOR_RANGE, n_inverters)
+        self.dc_ratio = self.rng.uniform(*DC_RATIO_RANGE, n_inverters)
+        self.rated_power = profile["rated_power_w"] * self.size_factor
+        self.cumulative_kwh = self.rng.uniform(0, 5000, n_inverters) * self.size_factor
+
+        # AR(1) cloud processes (shared regional + per-inverter), rescaled to the target interval
+        self.phi = profile["cloud_lag1"] ** (interval_minutes / max(profile["sample_minutes"], 1e-6))
+        self.innovation_sigma = profile["cloud_sigma"] * np.sqrt(1 - self.phi ** 2)
+        self.regional_cloud = 0.0
+        self.local_cloud = np.zeros(n_inverters)
+
+    def _cloud_process(self, n_steps):
+        regional = np.empty(n_steps)
+        local = np.empty((self.n_inverters, n_steps))
+        regional_noise = self.rng.normal(0, self.innovation_sigma, n_steps)
+        local_noise = self.rng.normal(0, self.innovation_sigma, (self.n_inverters, n_steps))
+        for t in range(n_steps):
+            self.regional_cloud = self.phi * self.regional_cloud + regional_noise[t]
+            self.local_cloud = self.phi * self.local_cloud + local_noise[:, t]
+            regional[t] = self.regional_cloud
+            local[:, t] = self.local_cloud
+        return np.sqrt(1 - LOCAL_CLOUD_SHARE) * regional + np.sqrt(LOCAL_CLOUD_SHARE) * local
+
+    def generate(self, start, end):
+        """{serial: export-schema DataFrame} for timestamps in [start, end)"""
+        grid = pd.date_range(start, end, freq=f"{self.interval_minutes}min", inclusive="left")
+        n_steps = len(grid)
+        if n_steps == 0:
+            return {serial: pd.DataFrame(columns=EXPORT_COLUMNS) for serial in self.serials}
+        times = grid.values
+        day_of_year = grid.dayofyear.to_numpy()
+        hour = (grid.hour + grid.minute / 60).to_numpy()
+
+        # Clear-sky power from solar geometry, then day-level and intra-day clearness
+        elevation = solar_elevation_array(times)
+        sin_elevation = np.clip(np.sin(np.radians(elevation)), 0, 1)
+        clear_sky = np.interp(sin_elevation, self.profile["envelope_sin_elevation"], self.profile["envelope_power_w"])
+
+        day_codes, day_index = np.unique(grid.normalize().values, return_inverse=True)
+        seasonal = 1 - WINTER_CLEARNESS_DROP * (1 - np.cos(2 * np.pi * (day_of_year - 172) / 365)) / 2
+        daily_clearness = self.rng.choice(self.profile["daily_clearness"], len(day_codes))[day_index] * seasonal
+        clearness = np.clip(daily_clearness + self._cloud_process(n_steps), 0.05, 1.3)
+
+        dc_power = clear_sky * clearness * (self.size_factor * self.dc_ratio)[:, np.newaxis]
+        power = np.minimum(dc_power, self.rated_power[:, np.newaxis])  # Clipping at rated AC power
+
+        # Energy counters integrate the true power, before any reporting faults
+        energy = power * self.interval_minutes / 60 / 1000
+        cumulative = np.cumsum(energy, axis=1)
+        first_of_day = np.searchsorted(day_index, np.arange(len(day_codes)))
+        daily_energy = cumulative - (cumulative - energy)[:, first_of_day][:, day_index]
+        cumulative_kwh = self.cumulative_kwh[:, np.newaxis] + cumulative
+        self.cumulative_kwh = cumulative_kwh[:, -1]
+
+        load = power / self.rated_power[:, np.newaxis]
+        shape = power.shape
+        ambient = (AMBIENT_MEAN_C - AMBIENT_SEASONAL_C * np.cos(2 * np.pi * (day_of_year - 15) / 365)
+                   + AMBIENT_DIURNAL_C * np.cos(2 * np.pi * (hour - 15) / 24))
+        temperature = ambient + INVERTER_TEMP_RISE_C * load + self.rng.normal(0, 0.5, shape)
+        voltage = NOMINAL_VOLTAGE + 3 * load + self.rng.normal(0, 1.5, shape)
+        frequency = NOMINAL_FREQUENCY + self.rng.normal(0, 0.02, shape)
+
+        reported = power
+        rising = np.gradient(elevation) > 0
+        awake = np.where(rising, elevation >= self.profile["wake_elevation_deg"],
+                         elevation >= self.profile["sleep_elevation_deg"])
+        awake = np.broadcast_to(awake, shape)
+        if self.faults:
+            reported = hold_last(reported, run_mask(self.rng, shape, STUCK_RATE, STUCK_MEAN_LENGTH))
+            reported = np.where(run_mask(self.rng, shape, DROPOUT_RATE, DROPOUT_MEAN_LENGTH), 0, reported)
+            spikes = self.rng.random(shape) < SPIKE_RATE
+            reported = np.where(spikes, reported * self.rng.uniform(*SPIKE_FACTOR_RANGE, shape), reported)
+            awake = awake & ~run_mask(self.rng, shape, GAP_RATE, GAP_MEAN_LENGTH)
+
+        resolution = self.profile["power_resolution_w"]
+        reported = np.round(reported / resolution) * resolution
+        current = reported / voltage
+
+        frames = {}
+        for i, serial in enumerate(self.serials):
+            rows = awake[i]
+            frames[serial] = pd.DataFrame({
+                EXPORT_COLUMNS[0]: grid[rows],
+                EXPORT_COLUMNS[1]: reported[i, rows],
+                EXPORT_COLUMNS[2]: daily_energy[i, rows].round(2),
+                EXPORT_COLUMNS[3]: current[i, rows].round(1),
+                EXPORT_COLUMNS[4]: voltage[i, rows].round(1),
+                EXPORT_COLUMNS[5]: temperature[i, rows].round(1),
+                EXPORT_COLUMNS[6]: cumulative_kwh[i, rows].round(1),
+                EXPORT_COLUMNS[7]: frequency[i, rows].round(2)
+            })
+        return frames
+
+
+# ------------------ OUTPUT ------------------
+def export_path(output_dir, serial, day, fmt="csv"):
+    return os.path.join(output_dir, f"Inverter{serial}-Detailed Data-{pd.Timestamp(day):%Y%m%d}.{fmt}")
+
+
+def write_export(frame, path):
+    """Write one export file atomically (CSV, or xlsx via openpyxl)"""
+    if path.endswith(".xlsx"):
+        tmp_path = f"{path}.tmp.xlsx"
+        frame.to_excel(tmp_path, index=False, engine="openpyxl")
+        os.replace(tmp_path, path)
+    else:
+        write_bytes_atomic(path, frame.to_csv(index=False, date_format="%Y-%m-%d %H:%M:%S").encode("utf-8"))
+
+
+def write_history(generator, start, end, output_dir=OUTPUT_DIR, split="month", fmt="csv"):
+    """Generate [start, end) month by month and write one file per inverter per day or month"""
+    os.makedirs(output_dir, exist_ok=True)
+    total_rows, started = 0, time.time()
+    for chunk_start in pd.date_range(pd.Timestamp(start).normalize(), end, freq="MS", inclusive="left").union(
+            [pd.Timestamp(start)]):
+        chunk_end = min(chunk_start + pd.offsets.MonthBegin(1), pd.Timestamp(end))
+        for serial, frame in generator.generate(chunk_start, chunk_end).items():
+            total_rows += len(frame)
+            if split == "day":
+                for day, day_frame in frame.groupby(frame[EXPORT_COLUMNS[0]].dt.normalize()):
+                    write_export(day_frame, export_path(output_dir, serial, day, fmt))
+            elif len(frame):
+                write_export(frame, export_path(output_dir, serial, frame[EXPORT_COLUMNS[0]].iloc[-1], fmt))
+        print(f"📅 {chunk_start:%Y-%m}: {total_rows:,} rows so far ({total_rows / (time.time() - started):,.0f} rows/s)")
+    return total_rows
+
+
+def run_live(generator, output_dir, start, speedup, flush_seconds=1.0, fmt="csv", release_seconds=RELEASE_SECONDS):
+    """Release rows as simulated time (start + speedup x wall time) passes them
+
+    Each inverter's file for the current day is rewritten atomically every
+    release_seconds with the rows due so far, so a watch folder sees a growing
+    daily export like the portal's that stays unchanged long enough to settle.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    sim_start = pd.Timestamp(start)
+    wall_start = time.monotonic()
+    generated_until = sim_start
+    pending = []  # Generated, not yet released frames (one per inverter per generated day)
+    day_files = {}  # (serial, day) -> released frames
+    touched = set()  # Day files with rows not yet written
+    released, last_write = 0, -float("inf")
+
+    print(f"🔴 Live: {generator.n_inverters} inverters from {sim_start} at {speedup:g}x real time -> {output_dir}")
+    try:
+        while True:
+            sim_now = sim_start + pd.Timedelta(seconds=(time.monotonic() - wall_start) * speedup)
+            while generated_until <= sim_now:
+                next_day = generated_until.normalize() + pd.Timedelta(days=1)
+                pending.extend(generator.generate(generated_until, next_day).items())
+                generated_until = next_day
+
+            still_pending = []
+            for serial, frame in pending:
+                due = frame[EXPORT_COLUMNS[0]] <= sim_now
+                if due.any():
+                    day = frame[EXPORT_COLUMNS[0]].iloc[0].normalize()
+                    day_files.setdefault((serial, day), []).append(frame[due])
+                    touched.add((serial, day))
+                    released += int(due.sum())
+                if not due.all():
+                    still_pending.append((serial, frame[~due]))
+            pending = still_pending
+
+            if touched and time.monotonic() - last_write >= release_seconds:
+                for serial, day in touched:
+                    write_export(pd.concat(day_files[(serial, day)], ignore_index=True),
+                                 export_path(output_dir, serial, day, fmt))
+                touched, last_write = set(), time.monotonic()
+                # Only today's files keep growing
+                day_files = {key: frames for key, frames in day_files.items() if key[1] >= sim_now.normalize()}
+
+            elapsed = time.monotonic() - wall_start
+            print(f"\r⏱️ {sim_now:%Y-%m-%d %H:%M}  {released:,} rows  ({released / max(elapsed, 1e-6):,.0f} rows/s)",
+                  end="", flush=True)
+            time.sleep(flush_seconds)
+    except KeyboardInterrupt:
+        print(f"\n🛑 Stopped after {released:,} rows")
+
+
+# ------------------ MAIN ------------------
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic inverter fleet data in the export schema")
+    parser.add_argument("--source", default=SOURCE_PATH, help="History to learn the profile from")
+    parser.add_argument("--inverters", type=int, default=10)
+    parser.add_argument("--years", type=float, default=1.0)
+    parser.add_argument("--start", default="2024-01-01", help="First timestamp (live mode default: now)")
+    parser.add_argument("--interval-minutes", type=int, default=INTERVAL_MINUTES)
+    parser.add_argument("--output", default=OUTPUT_DIR)
+    parser.add_argument("--split", choices=["day", "month"], default="month", help="One file per inverter per day/month")
+    parser.add_argument("--format", choices=["csv", "xlsx"], default="csv")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-faults", action="store_true", help="Disable gaps, stuck values, dropouts and spikes")
+    parser.add_argument("--live", action="store_true", help="Release rows in accelerated real time")
+    parser.add_argument("--speedup", type=float, default=60.0, help="Simulated seconds per wall-clock second")
+    parser.add_argument("--flush-seconds", type=float, default=1.0)
+    parser.add_argument("--release-seconds", type=float, default=RELEASE_SECONDS,
+                        help="Wall-clock seconds between live file rewrites; keep above 2x the watcher's --poll-seconds")
+    args = parser.parse_args()
+
+    profile = learn_profile(args.source)
+    print(f"📊 Learned from {profile['samples']} samples: rated {profile['rated_power_w']:.0f} W, "
+          f"{len(profile['daily_clearness'])} days, cloud lag-1 {profile['cloud_lag1']:.2f}, "
+          f"resolution {profile['power_resolution_w']:g} W")
+
+    generator = FleetGenerator(profile, args.inverters, args.interval_minutes, args.seed, faults=not args.no_faults)
+    if args.live:
+        start = pd.Timestamp.now().floor("min") if args.start == parser.get_default("start") else args.start
+        run_live(generator, args.output, start, args.speedup, args.flush_seconds, args.format,
+                 args.release_seconds)
+    else:
+        end = pd.Timestamp(args.start) + pd.Timedelta(days=round(365 * args.years))
+        rows = write_history(generator, args.start, end, args.output, args.split, args.format)
+        print(f"✅ Wrote {rows:,} rows for {args.inverters} inverters to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+Parallel multi-seed / multi-config LSTM training sweep.
+
+Trains every combination of --seq-lengths x --units x --horizons x --seeds in a
+pool of worker processes. The training series is loaded once into shared memory
+and every worker reads it in place. Worker count and per-worker TF threads are
+derived from the available cores. Each finished candidate is saved under
+models/sweep/ and registered in the model registry with its validation metrics
+and wall-clock training time.
+
+Usage:
+    python train_sweep.py --seq-lengths 48,96 --units 32,64 --horizons 4 --seeds 0,1,2
+"""
+# ------------------ IMPORTS ------------------
+import argparse
+import itertools
+import multiprocessing
+import os
+import time
+from datetime import datetime
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from model_registry import REGISTRY_DIR, ModelRegistry
+from multi_horizon import scale_windows
+from partitioned_store import DEFAULT_INVERTER, PartitionedStore
+from training_data import (load_power_series, load_power_series_from_store, make_window_dataset,
+                           window_count, window_views)
+
+# ------------------ CONFIGURATION ------------------
+REAL_DATA_DIR = "../data/real_data"
+FALLBACK_DATA_PATH = "../full_training_data.csv"
+SWEEP_DIR = "models/sweep"
+TRAIN_WINDOW_DAYS = 365
+
+EPOCHS = 30
+BATCH_SIZE = 64
+VALIDATION_SHARE = 0.2  # Chronological: the last 20% of the series
+EARLY_STOPPING_PATIENCE = 3
+MAX_VALIDATION_WINDOWS = 5000
+
+# Set in each worker by init_worker()
+_shared_series = None
+_shared_memory = None
+
+
+# ------------------ CORES ------------------
+def available_cores():
+    """Cores this process may run on (respects CPU affinity / container limits where exposed)"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def plan_workers(n_jobs, cores, workers=None, threads_per_worker=None):
+    """(workers, TF intra-op threads per worker) that together use every core once"""
+    workers = workers or max(1, min(n_jobs, cores))
+    threads_per_worker = threads_per_worker or max(1, cores // workers)
+    return workers, threads_per_worker
+
+
+# ------------------ WORKER ------------------
+def init_worker(shm_name, length, threads):
+    """Attach to the shared series and pin TF's thread pools before TF initializes"""
+    global _shared_series, _shared_memory
+    os.environ["TF_CPP_MIN_LOG_LEVEL"] = "2"
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+
+    _shared_memory = shared_memory.SharedMemory(name=shm_name)
+    _shared_series = np.ndarray((length,), dtype=np.float32, buffer=_shared_memory.buf)
+
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def build_model(seq_length, units, horizon):
+    from tensorflow.keras import Input
+    from tensorflow.keras.layers import LSTM, Dense
+    from tensorflow.keras.models import Sequential
+
+    model = Sequential([Input(shape=(seq_length, 1)), LSTM(units), Dense(horizon)])
+    model.compile(optimizer="adam", loss="mse")
+    return model
+
+
+def validation_metrics(model, series, seq_length, horizon):
+    """MAE/RMSE in watts on (at most MAX_VALIDATION_WINDOWS evenly spaced) validation windows"""
+    X, y = window_views(series, seq_length, horizon)
+    step = max(1, len(X) // MAX_VALIDATION_WINDOWS)
+    X, y = X[::step], y[::step]
+
+    # Same per-window scaling as serving; errors are measured after inverse scaling
+    scaled, mins, ranges = scale_windows(X)
+    outputs = np.asarray(model.predict(scaled[:, :, np.newaxis], batch_size=1024, verbose=0))
+    predictions = np.maximum(outputs.reshape(len(X), -1) * ranges + mins, 0)
+    errors = predictions - y
+    return {
+        "val_mae_w": round(float(np.mean(np.abs(errors))), 3),
+        "val_rmse_w": round(float(np.sqrt(np.mean(errors ** 2))), 3),
+        "val_windows": int(len(X))
+    }
+
+
+def train_candidate(job):
+    """Train one (config, seed) candidate in a worker; returns a result dict for registration"""
+    import tensorflow as tf
+
+    config, seed, epochs, output_dir = job["config"], job["seed"], job["epochs"], job["output_dir"]
+    seq_length, units, horizon = config["seq_length"], config["units"], config["horizon"]
+    name = f"lstm-s{seq_length}-u{units}-h{horizon}-seed{seed}"
+    tf.keras.utils.set_random_seed(seed)
+
+    # Chronological split; validation windows start after the last training target
+    split = int(len(_shared_series) * (1 - VALIDATION_SHARE))
+    train_series = _shared_series[:split]
+    validation_series = _shared_series[split - seq_length:]
+    if window_count(len(train_series), seq_length, horizon) == 0 or \
+            window_count(len(validation_series), seq_length, horizon) == 0:
+        return {"name": name, "config": config, "seed": seed, "error": "Not enough data for this configuration"}
+
+    dataset = make_window_dataset(train_series, seq_length, horizon, batch_size=BATCH_SIZE, seed=seed,
+                                  per_window_scaling=True, zero_copy=True)
+    validation = make_window_dataset(validation_series, seq_length, horizon, batch_size=BATCH_SIZE,
+                                     shuffle=False, per_window_scaling=True, zero_copy=True)
+
+    model = build_model(seq_length, units, horizon)
+    start = time.perf_counter()
+    history = model.fit(dataset, validation_data=validation, epochs=epochs, verbose=0,
+                        callbacks=[tf.keras.callbacks.EarlyStopping(patience=EARLY_STOPPING_PATIENCE,
+                                                                    restore_best_weights=True)])
+    training_time = time.perf_counter() - start
+
+    metrics = validation_metrics(model, validation_series, seq_length, horizon)
+    metrics["val_loss_scaled"] = round(float(min(history.history["val_loss"])), 6)
+
+    model_path = os.path.join(output_dir, f"{name}.keras")
+    model.save(model_path)
+    return {
+        "name": name,
+        "config": config,
+        "seed": seed,
+        "model_path": model_path,
+        "input_shape": list(model.input_shape),
+        "output_shape": list(model.output_shape),
+        "metrics": metrics,
+        "epochs_run": len(history.history["loss"]),
+        "training_time_s": round(training_time, 2),
+        "worker_pid": os.getpid()
+    }
+
+
+# ------------------ ORCHESTRATOR ------------------
+def load_training_series(data_path=None, inverter=DEFAULT_INVERTER, days=TRAIN_WINDOW_DAYS):
+    """(series, description): the partitioned store if it has data, else the flat CSV"""
+    if data_path is None:
+        store = PartitionedStore(REAL_DATA_DIR, ["timestamp", "real_power"])
+        if not store.is_empty():
+            values = load_power_series_from_store(store, days, inverter)
+            return values, {"source": REAL_DATA_DIR, "inverter": inverter, "days": days, "samples": len(values)}
+        data_path = FALLBACK_DATA_PATH
+    values = load_power_series(data_path)
+    return values, {"source": data_path, "samples": len(values)}
+
+
+def run_sweep(grid, seeds, data_path=None, epochs=EPOCHS, workers=None, threads_per_worker=None,
+              registry_dir=REGISTRY_DIR, output_dir=SWEEP_DIR, activate_best=False):
+    series, data_range = load_training_series(data_path)
+    configs = [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+    sweep_id = datetime.now().strftime("sweep-%Y%m%d-%H%M%S")
+    jobs = [{"config": config, "seed": seed, "epochs": epochs, "output_dir": output_dir}
+            for config in configs for seed in seeds]
+
+    workers, threads = plan_workers(len(jobs), available_cores(), workers, threads_per_worker)
+    print(f"🧪 {sweep_id}: {len(jobs)} candidates on {workers} workers x {threads} TF threads "
+          f"({len(series):,} samples from {data_range['source']})")
+
+    os.makedirs(output_dir, exist_ok=True)
+    registry = ModelRegistry(registry_dir)
+    shm = shared_memory.SharedMemory(create=True, size=max(series.nbytes, 1))
+    results = []
+    try:
+        np.ndarray(series.shape, dtype=np.float32, buffer=shm.buf)[:] = series
+        # spawn: TensorFlow is not fork-safe, and workers must configure threads before importing it
+        context = multiprocessing.get_context("spawn")
+        started = time.time()
+        with context.Pool(workers, initializer=init_worker, initargs=(shm.name, len(series), threads)) as pool:
+            # Registration happens here, one candidate at a time, so the registry index has a single writer
+            for result in pool.imap_unordered(train_candidate, jobs):
+                if "error" in result:
+                    print(f"⚠️ {result['name']}: {result['error']}")
+                    continue
+                manifest = registry.register(
+                    result["model_path"], version=f"{sweep_id}-{result['name']}",
+                    input_shape=result["input_shape"], output_shape=result["output_shape"],
+                    horizon=result["config"]["horizon"], training_data_range=data_range,
+                    validation_metrics=result["metrics"],
+                    extra={"sweep": sweep_id, "config": result["config"], "seed": result["seed"],
+                           "training_time_s": result["training_time_s"], "epochs_run": result["epochs_run"]})
+                result["version"] = manifest["version"]
+                results.append(result)
+                print(f"✅ {result['name']}: MAE {result['metrics']['val_mae_w']:.2f} W, "
+                      f"RMSE {result['metrics']['val_rmse_w']:.2f} W, {result['training_time_s']:.0f}s "
+                      f"({len(results)}/{len(jobs)})")
+    finally:
+        shm.close()
+        shm.unlink()
+
+    results.sort(key=lambda r: r["metrics"]["val_mae_w"])
+    print(f"\n🏁 Sweep finished in {time.time() - started:.0f}s")
+    for r in results[:10]:
+        print(f"   {r['metrics']['val_mae_w']:>9.2f} W  {r['version']}")
+
+    if activate_best and results:
+        best = results[0]["version"]
+        registry.mark_validated(best)
+        registry.activate(best)
+        print(f"🚀 Serving {best}")
+    return results
+
+
+# ------------------ MAIN ------------------
+def parse_int_list(text):
+    return [int(v) for v in text.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel LSTM training sweep with model registration")
+    parser.add_argument("--data", help="CSV/Parquet series (default: partitioned store, else full_training_data.csv)")
+    parser.add_argument("--seq-lengths", type=parse_int_list, default=[48, 96])
+    parser.add_argument("--units", type=parse_int_list, default=[32, 64])
+    parser.add_argument("--horizons", type=parse_int_list, default=[4])
+    parser.add_argument("--seeds", type=parse_int_list, default=[0, 1, 2])
+    parser.add_argument("--epochs", type=int, default=EPOCHS)
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per core, at most one per job)")
+    parser.add_argument("--threads-per-worker", type=int, help="TF intra-op threads (default: cores / workers)")
+    parser.add_argument("--registry", default=REGISTRY_DIR)
+    parser.add_argument("--output", default=SWEEP_DIR)
+    parser.add_argument("--activate-best", action="store_true",
+                        help="Mark the lowest-MAE candidate validated and serve it")
+    args = parser.parse_args()
+
+    grid = {"seq_length": args.seq_lengths, "units": args.units, "horizon": args.horizons}
+    run_sweep(grid, args.seeds, args.data, args.epochs, args.workers, args.threads_per_worker,
+              args.registry, args.output, args.activate_best)
+
+
+if __name__ == "__main__":
+    main()
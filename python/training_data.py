@@ -0,0 +1,100 @@
+# ------------------ IMPORTS ------------------
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# ------------------ CONFIGURATION ------------------
+BATCH_SIZE = 64
+SHUFFLE_BUFFER = 4096
+
+
+# ------------------ LOAD SERIES ------------------
+def load_power_series(path, column='real_power'):
+    """Load one power column as a float32 series ordered by timestamp (CSV or Parquet)"""
+    if str(path).endswith('.parquet'):
+        df = pd.read_parquet(path, columns=['timestamp', column])
+    else:
+        df = pd.read_csv(path, usecols=['timestamp', column], dtype={column: np.float32})
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    df = df.sort_values('timestamp', kind='stable')
+    return df[column].to_numpy(dtype=np.float32)
+
+
+def load_power_series_from_store(store, days, inverter='default', column='real_power'):
+    """Load the last `days` of one inverter from a PartitionedStore, touching only those partitions"""
+    end = store.latest_timestamp(inverter)
+    if end is None:
+        return np.empty(0, dtype=np.float32)
+    df = store.read_range(start=end - pd.Timedelta(days=days), end=end, inverter=inverter)
+    return df.sort_values('timestamp', kind='stable')[column].to_numpy(dtype=np.float32)
+
+
+# ------------------ WINDOW VIEWS ------------------
+def window_count(n_values, seq_length, horizon):
+    return max(0, n_values - seq_length - horizon + 1)
+
+
+def window_views(values, seq_length, horizon):
+    """(X, y) windows as strided views over `values` - no per-window copies
+
+    X has shape (n_windows, seq_length, ...) and y (n_windows, horizon, ...);
+    both share memory with `values`, so memory stays O(len(values)).
+    """
+    values = np.asarray(values)
+    if window_count(len(values), seq_length, horizon) == 0:
+        return (np.empty((0, seq_length) + values.shape[1:], values.dtype),
+                np.empty((0, horizon) + values.shape[1:], values.dtype))
+
+    windows = sliding_window_view(values, seq_length + horizon, axis=0)
+    # sliding_window_view puts the window axis last; move it next to the batch axis
+    windows = np.moveaxis(windows, -1, 1)
+    return windows[:, :seq_length], windows[:, seq_length:]
+
+
+# ------------------ TF.DATA PIPELINE ------------------
+def make_window_dataset(values, seq_length, horizon, batch_size=BATCH_SIZE,
+                        shuffle_buffer=SHUFFLE_BUFFER, shuffle=True, seed=None,
+                        per_window_scaling=False, zero_copy=False):
+    """Batched (X, y) tf.data pipeline that slices windows lazily from one copy of the series
+
+    Only window start indices are shuffled and batched; each batch gathers its
+    windows from the series tensor on the fly and is prefetched in the background.
+    X batches have shape (batch, seq_length, 1) and y batches (batch, horizon).
+
+    per_window_scaling min-max scales each window by its input part, the way the
+    serving path (prepare_sequence_data) does. zero_copy gathers straight from the
+    numpy array (e.g. a shared-memory view) instead of copying it into a tensor.
+    """
+    import tensorflow as tf
+
+    values = np.asarray(values, dtype=np.float32).reshape(-1)
+    n_windows = window_count(len(values), seq_length, horizon)
+    offsets = np.arange(seq_length + horizon)
+
+    if zero_copy:
+        def gather(starts):
+            windows = tf.numpy_function(lambda s: values[s[:, np.newaxis] + offsets], [starts], tf.float32)
+            return tf.ensure_shape(windows, [None, seq_length + horizon])
+    else:
+        series = tf.constant(values)
+
+        def gather(starts):
+            return tf.gather(series, starts[:, tf.newaxis] + offsets)
+
+    def gather_windows(starts):
+        windows = gather(starts)
+        if per_window_scaling:
+            low = tf.reduce_min(windows[:, :seq_length], axis=1, keepdims=True)
+            span = tf.reduce_max(windows[:, :seq_length], axis=1, keepdims=True) - low
+            windows = (windows - low) / tf.where(span > 0, span, tf.ones_like(span))
+        return windows[:, :seq_length, tf.newaxis], windows[:, seq_length:]
+
+    dataset = tf.data.Dataset.range(n_windows)
+    if shuffle:
+        dataset = dataset.shuffle(min(shuffle_buffer, max(n_windows, 1)), seed=seed,
+                                  reshuffle_each_iteration=True)
+    return (dataset
+            .batch(batch_size)
+            .map(lambda starts: gather_windows(tf.cast(starts, tf.int32)),
+                 num_parallel_calls=tf.data.AUTOTUNE)
+            .prefetch(tf.data.AUTOTUNE))
@@ -0,0 +1,54 @@
+# ------------------ IMPORTS ------------------
+import numpy as np
+
+# ------------------ CONFIGURATION ------------------
+MC_SAMPLES = 32  # Monte-Carlo dropout samples, all evaluated in one batch
+QUANTILES = (10, 50, 90)
+
+
+# ------------------ DROPOUT DETECTION ------------------
+def has_dropout(model):
+    """True if any layer applies dropout (Dropout layers or LSTM dropout/recurrent_dropout)"""
+    for layer in model.layers:
+        config = layer.get_config()
+        if config.get('rate', 0) and 'dropout' in layer.__class__.__name__.lower():
+            return True
+        if config.get('dropout', 0) or config.get('recurrent_dropout', 0):
+            return True
+    return False
+
+
+# ------------------ QUANTILE FORECAST ------------------
+def batch_predict_with_quantiles(model, X_batch, n_samples=MC_SAMPLES, quantiles=QUANTILES):
+    """Point forecasts plus quantiles for a batch of windows in one MC-dropout forward pass
+
+    Every window is tiled n_samples times into a single batch and evaluated with
+    dropout active. Returns an array of shape (batch, 1 + len(quantiles), n_outputs):
+    row 0 is the sample mean, the remaining rows are the requested percentiles.
+    Models without dropout yield a degenerate interval around the point forecast.
+    """
+    n_windows = len(X_batch)
+    if not has_dropout(model):
+        point = np.asarray(model(X_batch, training=False)).reshape(n_windows, 1, -1)
+        return np.repeat(point, 1 + len(quantiles), axis=1)
+
+    tiled = np.repeat(X_batch, n_samples, axis=0)
+    samples = np.asarray(model(tiled, training=True)).reshape(n_windows, n_samples, -1)
+    mean = samples.mean(axis=1, keepdims=True)
+    percentiles = np.moveaxis(np.percentile(samples, quantiles, axis=1), 0, 1)
+    return np.concatenate([mean, percentiles], axis=1)
+
+
+def predict_with_quantiles(model, X_input, n_samples=MC_SAMPLES, quantiles=QUANTILES):
+    """Single-window version of batch_predict_with_quantiles: shape (1 + len(quantiles), n_outputs)"""
+    return batch_predict_with_quantiles(model, X_input, n_samples, quantiles)[0]
+
+
+# ------------------ CONFIDENCE ------------------
+def interval_confidence(p10, p90, point):
+    """Confidence (%) from the relative P10-P90 interval width; None if the interval is degenerate"""
+    width = np.asarray(p90) - np.asarray(p10)
+    if not np.any(width > 0):
+        return None
+    relative_width = width / np.maximum(np.asarray(point), 1.0)
+    return float(np.clip(100 - np.mean(relative_width) * 100, 0, 100))
@@ -0,0 +1,122 @@
+# ------------------ IMPORTS ------------------
+import os
+import re
+
+import pandas as pd
+
+from atomic_io import read_json, write_json_atomic
+
+# ------------------ CONFIGURATION ------------------
+WATCH_DIR = "../data/incoming"
+INGEST_STATE_PATH = "../data/ingest_state.json"
+POLL_SECONDS = 30
+# Daily portal export, e.g. "InverterSA1ES111K4H349-Detailed Data-20250630.xlsx" (CSV re-exports accepted too)
+EXPORT_PATTERN = re.compile(r"^Inverter(?P<serial>[A-Za-z0-9]+)-Detailed Data-(?P<date>\d{8})\.(?:xlsx|csv)$",
+                            re.IGNORECASE)
+
+
+# ------------------ FILE NAMES ------------------
+def parse_export_name(filename):
+    """(inverter serial, export date) from an export file name, or None if it isn't one"""
+    match = EXPORT_PATTERN.match(os.path.basename(filename))
+    if not match:
+        return None
+    return match.group("serial"), match.group("date")
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+# ------------------ WATCH FOLDER ------------------
+class WatchFolder:
+    """Polls a drop directory and yields only rows newer than each inverter's high-water mark
+
+    A file is read when its (size, mtime) differs from the last ingested signature
+    and has been stable for one poll, so exports still being copied are skipped.
+    An export the loader can't read is remembered by signature and retried only
+    once the file changes.
+    Overlapping exports (a re-download of the same or an earlier day) contribute
+    nothing beyond their new rows.
+    """
+
+    def __init__(self, watch_dir=WATCH_DIR, state_path=INGEST_STATE_PATH):
+        self.watch_dir = watch_dir
+        self.state_path = state_path
+        self.state = read_json(state_path) or {"files": {}, "high_water_marks": {}}
+        self.state.setdefault("failed", {})  # name -> signature of an unreadable version
+        self._pending = {}  # name -> signature seen on the previous poll, waiting to settle
+        self._polled = {}  # name -> signature of the version handed out by poll(), until it is marked
+
+    def _save(self):
+        write_json_atomic(self.state_path, self.state)
+
+    # ---------- high-water marks ----------
+    def high_water_mark(self, inverter):
+        value = self.state["high_water_marks"].get(inverter)
+        return pd.Timestamp(value) if value else None
+
+    def advance(self, inverter, timestamp):
+        """Move an inverter's high-water mark forward (never backwards)"""
+        current = self.high_water_mark(inverter)
+        if timestamp is not None and (current is None or timestamp > current):
+            self.state["high_water_marks"][inverter] = pd.Timestamp(timestamp).isoformat()
+
+    # ---------- polling ----------
+    def changed_files(self):
+        """(path, serial, signature) of settled exports new or changed since last ingested, oldest export first"""
+        if not os.path.isdir(self.watch_dir):
+            return []
+
+        ready, seen = [], set()
+        for entry in os.scandir(self.watch_dir):
+            parsed = parse_export_name(entry.name) if entry.is_file() else None
+            if parsed is None:
+                continue
+            seen.add(entry.name)
+            signature = file_signature(entry.path)
+            if signature in (self.state["files"].get(entry.name), self.state["failed"].get(entry.name)):
+                continue
+            if self._pending.get(entry.name) == signature:
+                ready.append((parsed[1], entry.name, entry.path, parsed[0], signature))
+            else:
+                self._pending[entry.name] = signature
+
+        self._pending = {name: sig for name, sig in self._pending.items() if name in seen}
+        return [(path, serial, signature) for _, _, path, serial, signature in sorted(ready)]
+
+    def poll(self, loader):
+        """List of (path, inverter, new_rows) for every changed file; call mark_ingested() once processed
+
+        loader(path) returns a frame with a 'timestamp' column (or None if unreadable).
+        """
+        batches = []
+        for path, inverter, signature in self.changed_files():
+            # The file may be rewritten while it is processed; only the version seen here counts as read
+            self._polled[os.path.basename(path)] = signature
+            frame = loader(path)
+            if frame is None:
+                self.mark_failed(path)
+                continue
+            hwm = self.high_water_mark(inverter)
+            new_rows = frame if hwm is None else frame[frame['timestamp'] > hwm]
+            batches.append((path, inverter, new_rows.sort_values('timestamp', kind='stable')))
+        return batches
+
+    def mark_failed(self, path):
+        """Skip this version of an unreadable export until the file changes"""
+        name = os.path.basename(path)
+        self.state["failed"][name] = self._polled.pop(name, None) or file_signature(path)
+        self._pending.pop(name, None)
+        self._save()
+
+    def mark_ingested(self, path, inverter, new_rows):
+        """Record the file signature and advance the high-water mark past the rows just processed"""
+        name = os.path.basename(path)
+        self.state["files"][name] = self._polled.pop(name, None) or file_signature(path)
+        self.state["failed"].pop(name, None)
+        self._pending.pop(name, None)
+        if len(new_rows):
+            self.advance(inverter, new_rows['timestamp'].max())
+        self._save()